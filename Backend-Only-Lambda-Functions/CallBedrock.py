@@ -6,11 +6,15 @@ from datetime import datetime
 bedrock_runtime = boto3.client('bedrock-runtime', region_name='us-east-1')
 bedrock_agent_runtime = boto3.client('bedrock-agent-runtime', region_name='us-east-1')
 dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
+s3 = boto3.client('s3', region_name='us-east-1')
 
 TABLE_NAME = 'ContentTable'
 KNOWLEDGE_BASE_ID = 'EQUSJEXPFY'  # Your NCERT KB
 MODEL_ID = 'amazon.titan-text-express-v1'
 
+# The prompt only uses the first 3000 characters; UTF-8 needs at most 4 bytes per character
+EXTRACTED_TEXT_MAX_CHARS = 3000
+
 table = dynamodb.Table(TABLE_NAME)
 
 def lambda_handler(event, context):
@@ -20,7 +24,7 @@ def lambda_handler(event, context):
     Input:
     {
         "contentId": "CNT-ABC123",
-        "extractedText": "...",
+        "extractedTextS3": {"bucket": "...", "key": "extracted/CNT-ABC123.txt"},
         "enhancementType": "Simplify Language",
         "targetAudience": "Elementary Students",
         "instruction": "Add examples",
@@ -30,7 +34,7 @@ def lambda_handler(event, context):
     
     try:
         content_id = event['contentId']
-        extracted_text = event.get('extractedText', '')
+        extracted_text = load_extracted_text(event)
         enhancement_type = event.get('enhancementType', 'Simplify Language')
         target_audience = event.get('targetAudience', 'Elementary Students')
         instruction = event.get('instruction', '')
@@ -38,16 +42,6 @@ def lambda_handler(event, context):
         
         print(f"Enhancing content {content_id} for {target_audience}")
         
-        # Update progress
-        table.update_item(
-            Key={'contentId': content_id},
-            UpdateExpression='SET progress = :p, currentStep = :step',
-            ExpressionAttributeValues={
-                ':p': 50,
-                ':step': 'Enhancing content with AI'
-            }
-        )
-        
         # Step 1: Retrieve context from Knowledge Base
         kb_context = ""
         try:
@@ -109,16 +103,6 @@ def lambda_handler(event, context):
         # Step 4: Parse enhanced content into structured format
         enhanced_data = parse_enhanced_content(enhanced_text, subject, target_audience)
         
-        # Update progress
-        table.update_item(
-            Key={'contentId': content_id},
-            UpdateExpression='SET progress = :p, currentStep = :step',
-            ExpressionAttributeValues={
-                ':p': 70,
-                ':step': 'Content enhancement completed'
-            }
-        )
-        
         # Return enhanced content
         return {
             'contentId': content_id,
@@ -148,6 +132,27 @@ def lambda_handler(event, context):
         raise
 
 
+def load_extracted_text(event):
+    """Read the start of the extracted text from S3 (falls back to an inline extractedText)"""
+    location = event.get('extractedTextS3')
+    if not location:
+        return event.get('extractedText', '')
+    
+    # Textract found no text; S3 rejects a byte range on an empty object (416 InvalidRange)
+    if location.get('length') == 0:
+        return ''
+    
+    # Ranged read: only the prefix the prompt uses is downloaded, however long the document is
+    response = s3.get_object(
+        Bucket=location['bucket'],
+        Key=location['key'],
+        Range=f"bytes=0-{EXTRACTED_TEXT_MAX_CHARS * 4 - 1}"
+    )
+    # A multi-byte character may be cut at the range boundary; drop the partial tail
+    text = response['Body'].read().decode('utf-8', errors='ignore')
+    return text[:EXTRACTED_TEXT_MAX_CHARS]
+
+
 def build_enhancement_prompt(extracted_text, enhancement_type, target_audience, instruction, kb_context):
     """Build prompt for Bedrock"""
     
@@ -643,11 +643,24 @@ def lambda_handler(event, context):
     Entry point for Lambda. Supports:
       - Direct invocation with JSON payload
       - API Gateway proxy integration: event contains 'body' string (JSON)
+      - SNS subscription: each record's Message is a JSON payload
     """
     logger.info("Email Service: Processing email request")
     logger.debug("Received event: %s", json.dumps(event))
 
     try:
+        if 'Records' in event:
+            # SNS delivery (e.g. report-ready notifications); handle each message independently
+            results = []
+            for record in event['Records']:
+                try:
+                    message = json.loads(record['Sns']['Message'])
+                    results.append(handle_template_email(message) if message.get('email_type') else handle_simple_email(message))
+                except Exception as e:
+                    logger.exception("Failed to process SNS email record")
+                    results.append({'statusCode': 500, 'body': json.dumps({'error': str(e)})})
+            return {'statusCode': 200, 'body': json.dumps({'processed': len(results)})}
+
         if 'body' in event and isinstance(event['body'], str):
             # API Gateway request
             body = json.loads(event['body']) if event['body'] else {}
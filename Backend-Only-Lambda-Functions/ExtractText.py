@@ -1,11 +1,13 @@
 import json
 import boto3
 import os
+import time
 from datetime import datetime
 
 # Initialize AWS clients
 textract = boto3.client('textract', region_name='us-east-1')
 dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
+s3 = boto3.client('s3', region_name='us-east-1')
 
 TABLE_NAME = 'ContentTable'
 table = dynamodb.Table(TABLE_NAME)
@@ -29,16 +31,6 @@ def lambda_handler(event, context):
         
         print(f"Starting Textract for {content_id}: s3://{input_bucket}/{s3_key}")
         
-        # Update progress
-        table.update_item(
-            Key={'contentId': content_id},
-            UpdateExpression='SET progress = :p, currentStep = :step',
-            ExpressionAttributeValues={
-                ':p': 10,
-                ':step': 'Extracting text from document'
-            }
-        )
-        
         # Start Textract job
         response = textract.start_document_text_detection(
             DocumentLocation={
@@ -50,31 +42,31 @@ def lambda_handler(event, context):
         )
         
         job_id = response['JobId']
+        started_at = int(time.time())
         print(f"Textract JobId: {job_id}")
         
-        # Update DynamoDB with Textract Job ID
+        # Document size feeds GetTextractResult's expected-duration model (optional)
+        try:
+            document_bytes = s3.head_object(Bucket=input_bucket, Key=s3_key)['ContentLength']
+        except Exception as head_error:
+            print(f"Could not read document size (continuing without): {str(head_error)}")
+            document_bytes = 0
+        
+        # Update DynamoDB with Textract Job ID and start time
         table.update_item(
             Key={'contentId': content_id},
-            UpdateExpression='SET textractJobId = :jobId',
+            UpdateExpression='SET textractJobId = :jobId, textractStartedAt = :startedAt',
             ExpressionAttributeValues={
-                ':jobId': job_id
+                ':jobId': job_id,
+                ':startedAt': started_at
             }
         )
         
-        # Return for next step
-        return {
-            'contentId': content_id,
-            'textractJobId': job_id,
-            's3Key': s3_key,
-            'inputBucket': input_bucket,
-            'teacherId': event.get('teacherId'),
-            'classSubject': event.get('classSubject'),
-            'subject': event.get('subject'),
-            'enhancementType': event.get('enhancementType'),
-            'targetAudience': event.get('targetAudience'),
-            'instruction': event.get('instruction'),
-            'language': event.get('language')
-        }
+        # Return for next step (forward the incoming state as-is)
+        event['textractJobId'] = job_id
+        event['textractStartedAt'] = started_at
+        event['documentBytes'] = document_bytes
+        return event
         
     except Exception as e:
         print(f"Error in ExtractText: {str(e)}")
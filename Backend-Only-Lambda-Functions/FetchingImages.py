@@ -1,17 +1,20 @@
 import json
 import boto3
 import urllib3
+from urllib.parse import quote_plus
+from urllib3.util.retry import Retry
 from datetime import datetime
 
 s3 = boto3.client('s3', region_name='us-east-1')
-dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
 
-TABLE_NAME = 'ContentTable'
 OUTPUT_BUCKET = 'sahayak-enhancer-output-02'
 UNSPLASH_API_URL = 'https://source.unsplash.com/800x600/?'
 
-table = dynamodb.Table(TABLE_NAME)
-http = urllib3.PoolManager()
+# Keep the retry/timeout budget tight so a slow image host can't stall the whole step
+HTTP_RETRY = Retry(total=1, backoff_factor=0.2, status_forcelist=[429, 500, 502, 503, 504])
+HTTP_TIMEOUT = urllib3.Timeout(connect=2.0, read=5.0)
+
+http = urllib3.PoolManager(num_pools=5, maxsize=8, retries=HTTP_RETRY, timeout=HTTP_TIMEOUT)
 
 def lambda_handler(event, context):
     """
@@ -26,6 +29,10 @@ def lambda_handler(event, context):
             ]
         }
     }
+    
+    Output: the input state with "enhanced" replaced by
+    "enhancedRef": {"bucket": ..., "key": "<contentId>/enhanced.json"}.
+    Only if that S3 write fails is "enhanced" passed through inline.
     """
     
     try:
@@ -35,16 +42,6 @@ def lambda_handler(event, context):
         
         print(f"Fetching {len(image_prompts)} images for {content_id}")
         
-        # Update progress
-        table.update_item(
-            Key={'contentId': content_id},
-            UpdateExpression='SET progress = :p, currentStep = :step',
-            ExpressionAttributeValues={
-                ':p': 90,
-                ':step': 'Fetching educational images'
-            }
-        )
-        
         image_links = []
         
         for idx, img_prompt in enumerate(image_prompts[:5], 1):  # Max 5 images
@@ -53,14 +50,14 @@ def lambda_handler(event, context):
                 continue
             
             try:
-                # Generate search query from prompt
-                search_query = prompt.replace(' ', ',')
+                # Generate comma-separated, URL-encoded search query from prompt
+                search_query = quote_plus(','.join(prompt.split()), safe=',')
                 image_url = f"{UNSPLASH_API_URL}{search_query}"
                 
                 print(f"Fetching image {idx}: {image_url}")
                 
                 # Download image
-                response = http.request('GET', image_url, timeout=10.0, retries=3)
+                response = http.request('GET', image_url)
                 
                 if response.status == 200:
                     # Upload to S3
@@ -93,20 +90,35 @@ def lambda_handler(event, context):
         
         print(f"Successfully fetched {len(image_links)} images")
         
-        # Return updated enhanced content
-        return {
-            'contentId': content_id,
-            'enhanced': enhanced,
-            's3Paths': event.get('s3Paths', {}),
-            **{k: v for k, v in event.items() if k not in ['contentId', 'enhanced', 's3Paths']}
-        }
+        # Forward the incoming state with a reference in place of the blob
+        return forward_with_ref(event, content_id, enhanced)
         
     except Exception as e:
         print(f"Error in FetchImages: {str(e)}")
-        # Non-critical error - continue without images
-        return {
-            'contentId': event.get('contentId'),
-            'enhanced': event.get('enhanced', {}),
-            's3Paths': event.get('s3Paths', {}),
-            'imageError': str(e)
-        }
+        # Non-critical error - continue without images, in the same shape as the success path
+        event['imageError'] = str(e)
+        try:
+            return forward_with_ref(event, event['contentId'], event.get('enhanced', {}))
+        except Exception as spill_error:
+            # Nowhere to spill to; consumers read enhancedRef when present and fall back to inline enhanced
+            print(f"Could not persist enhanced content: {str(spill_error)}")
+            event.setdefault('s3Paths', {})
+            return event
+
+def forward_with_ref(event, content_id, enhanced):
+    """Persist enhanced content to S3 and swap it for an enhancedRef so the state payload stays small"""
+    enhanced_key = f"{content_id}/enhanced.json"
+    s3.put_object(
+        Bucket=OUTPUT_BUCKET,
+        Key=enhanced_key,
+        Body=json.dumps(enhanced, ensure_ascii=False).encode('utf-8'),
+        ContentType='application/json'
+    )
+    
+    event.pop('enhanced', None)
+    event.setdefault('s3Paths', {})
+    event['enhancedRef'] = {
+        'bucket': OUTPUT_BUCKET,
+        'key': enhanced_key
+    }
+    return event
@@ -1,5 +1,6 @@
 import json
 import boto3
+import bisect
 import csv
 import io
 from datetime import datetime
@@ -8,6 +9,13 @@ from decimal import Decimal
 dynamodb = boto3.resource('dynamodb')
 s3 = boto3.client('s3')
 
+# Grade lookup: GRADES[i] applies from GRADE_THRESHOLDS[i-1] (inclusive) up to GRADE_THRESHOLDS[i]
+GRADE_THRESHOLDS = [45, 50, 55, 60, 65, 70, 75, 80, 85, 90]
+GRADES = ['F', 'D', 'C-', 'C', 'C+', 'B-', 'B', 'B+', 'A-', 'A', 'A+']
+
+# Report buffer reused across warm invocations (one invocation per container at a time)
+_report_buffer = io.BytesIO()
+
 class DecimalEncoder(json.JSONEncoder):
     def default(self, obj):
         if isinstance(obj, Decimal):
@@ -98,7 +106,7 @@ def lambda_handler(event, context):
         s3.put_object(
             Bucket='assignment-system-dev',
             Key=report_key,
-            Body=csv_buffer.getvalue().encode('utf-8'),
+            Body=csv_buffer,
             ContentType='text/csv'
         )
         
@@ -144,9 +152,12 @@ def lambda_handler(event, context):
         }
 
 def generate_csv_report(assignment, submissions):
-    """Generate CSV report from submissions data"""
-    output = io.StringIO()
-    writer = csv.writer(output)
+    """Generate CSV report from submissions data as a UTF-8 bytes buffer"""
+    output = _report_buffer
+    output.seek(0)
+    output.truncate()
+    text_stream = io.TextIOWrapper(output, encoding='utf-8', newline='', write_through=True)
+    writer = csv.writer(text_stream)
     
     # Write header
     writer.writerow([
@@ -177,6 +188,10 @@ def generate_csv_report(assignment, submissions):
             submission.get('evaluated_at', '')
         ])
     
+    # Detach so the wrapper doesn't close the underlying buffer when collected
+    text_stream.flush()
+    text_stream.detach()
+    output.seek(0)
     return output
 
 def generate_report_summary(assignment, submissions):
@@ -236,17 +251,7 @@ def send_report_email(assignment_id, report_key, assignment, teacher_email):
 
 def calculate_grade(percentage):
     """Calculate grade from percentage"""
-    if percentage >= 90: return 'A+'
-    elif percentage >= 85: return 'A'
-    elif percentage >= 80: return 'A-'
-    elif percentage >= 75: return 'B+'
-    elif percentage >= 70: return 'B'
-    elif percentage >= 65: return 'B-'
-    elif percentage >= 60: return 'C+'
-    elif percentage >= 55: return 'C'
-    elif percentage >= 50: return 'C-'
-    elif percentage >= 45: return 'D'
-    else: return 'F'
+    return GRADES[bisect.bisect_right(GRADE_THRESHOLDS, percentage)]
 
 def convert_decimals_to_floats(obj):
     """Convert Decimal objects to float for JSON serialization"""
@@ -1,13 +1,21 @@
 import os
 import json
 import boto3
-import uuid
+import secrets
+from botocore.config import Config
 
 S3_BUCKET = os.environ.get("RAW_BUCKET", "sahayak-raw-worksheets")
 PRESIGNED_EXPIRATION = int(os.environ.get("PRESIGNED_EXPIRATION", "900"))
 TABLE_NAME = os.environ.get("WORKSHEETS_TABLE", None)
 
-s3 = boto3.client("s3")
+# SigV4 + virtual-hosted addressing signs the URL locally and avoids a redirect on upload
+boto_config = Config(
+    signature_version="s3v4",
+    s3={"addressing_style": "virtual"},
+    tcp_keepalive=True
+)
+
+s3 = boto3.client("s3", config=boto_config)
 dynamodb = boto3.resource("dynamodb")
 table = dynamodb.Table(TABLE_NAME) if TABLE_NAME else None
 
@@ -30,7 +38,7 @@ def lambda_handler(event, context):
             except Exception as e:
                 print("DDB read error:", e)
 
-        content_id = f"CNT-{uuid.uuid4().hex[:8]}"
+        content_id = f"CNT-{secrets.token_hex(4)}"
         key = f"raw-content/{worksheet_id}/{content_id}_{file_name}"
 
         presigned_url = s3.generate_presigned_url(
@@ -1,12 +1,62 @@
+import os
 import json
 import boto3
+import base64
+import bisect
 import csv
 import io
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from decimal import Decimal
+from botocore.config import Config
 
-dynamodb = boto3.resource('dynamodb')
-s3 = boto3.client('s3')
+boto_config = Config(
+    max_pool_connections=50,
+    retries={'max_attempts': 3, 'mode': 'adaptive'},
+    tcp_keepalive=True
+)
+
+dynamodb = boto3.resource('dynamodb', config=boto_config)
+s3 = boto3.client('s3', config=boto_config)
+lambda_client = boto3.client('lambda', config=boto_config)
+sns_client = boto3.client('sns', config=boto_config)
+
+# When set, report-ready emails are published to SNS (EmailService-dev subscribes) instead of invoking the Lambda
+REPORT_READY_TOPIC_ARN = os.environ.get('REPORT_READY_TOPIC_ARN')
+
+submissions_table = dynamodb.Table('Submissions-dev')
+
+# Grade lookup: GRADES[i] applies from GRADE_THRESHOLDS[i-1] (inclusive) up to GRADE_THRESHOLDS[i]
+GRADE_THRESHOLDS = [45, 50, 55, 60, 65, 70, 75, 80, 85, 90]
+GRADES = ['F', 'D', 'C-', 'C', 'C+', 'B-', 'B', 'B+', 'A-', 'A', 'A+']
+PERFORMANCE_BAND_THRESHOLDS = [60, 70, 85]
+PERFORMANCE_BANDS = ['Needs Improvement', 'Average', 'Good', 'Excellent']
+
+# Only the attributes the reports read; evaluation_results is trimmed to its first
+# entry, which is all get_overall_feedback looks at
+SUBMISSION_PROJECTION = (
+    'submission_id, student_id, assignment_id, student_name, student_email, '
+    'submitted_at, evaluated_at, evaluation_status, final_score, max_score, #er[0]'
+)
+SUBMISSION_PROJECTION_NAMES = {'#er': 'evaluation_results'}
+
+# Number of parallel submitted_at sub-range queries used when a date window is given
+SUBMISSION_QUERY_SEGMENTS = 4
+
+# Assignment details cached across warm invocations: assignment_id -> (fetched_at, details)
+# Subject/topic/teacher_name are effectively immutable once an assignment is created
+ASSIGNMENT_CACHE_TTL = int(os.environ.get('ASSIGNMENT_CACHE_TTL', '3600'))
+ASSIGNMENT_CACHE_MAX = 4096
+_assignment_cache = OrderedDict()
+
+# Inline reports are base64-encoded (+33%) and must fit Lambda's 6 MB response limit
+INLINE_REPORT_MAX_BYTES = 4 * 1024 * 1024
+
+# Inline report buffer reused across warm invocations (one invocation per container at a time)
+_report_buffer = io.BytesIO()
 
 class DecimalEncoder(json.JSONEncoder):
     def default(self, obj):
@@ -14,6 +64,69 @@ class DecimalEncoder(json.JSONEncoder):
             return float(obj)
         return super(DecimalEncoder, self).default(obj)
 
+class S3StreamingUpload(io.RawIOBase):
+    """Writable binary stream that uploads to S3 in multipart chunks as data is written"""
+    PART_SIZE = 5 * 1024 * 1024  # S3 minimum size for every part but the last
+    
+    def __init__(self, bucket, key, content_type):
+        super().__init__()
+        self.bucket = bucket
+        self.key = key
+        self.content_type = content_type
+        self.pending = bytearray()
+        self.parts = []
+        self.upload_id = None
+    
+    def writable(self):
+        return True
+    
+    def write(self, data):
+        self.pending.extend(data)
+        if len(self.pending) >= self.PART_SIZE:
+            self._upload_part()
+        return len(data)
+    
+    def _upload_part(self):
+        if self.upload_id is None:
+            self.upload_id = s3.create_multipart_upload(
+                Bucket=self.bucket, Key=self.key, ContentType=self.content_type
+            )['UploadId']
+        
+        part_number = len(self.parts) + 1
+        response = s3.upload_part(
+            Bucket=self.bucket, Key=self.key, UploadId=self.upload_id,
+            PartNumber=part_number, Body=bytes(self.pending)
+        )
+        self.parts.append({'ETag': response['ETag'], 'PartNumber': part_number})
+        self.pending.clear()
+    
+    def complete(self):
+        """Finish the upload; small objects that never filled a part go up as a single PUT"""
+        if self.upload_id is None:
+            s3.put_object(
+                Bucket=self.bucket, Key=self.key,
+                Body=bytes(self.pending), ContentType=self.content_type
+            )
+        else:
+            if self.pending:
+                self._upload_part()
+            s3.complete_multipart_upload(
+                Bucket=self.bucket, Key=self.key, UploadId=self.upload_id,
+                MultipartUpload={'Parts': self.parts}
+            )
+        self.pending.clear()
+        self.close()
+    
+    def abort(self):
+        """Discard any parts already uploaded"""
+        if self.upload_id is not None:
+            try:
+                s3.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self.upload_id)
+            except Exception as e:
+                print(f"Failed to abort multipart upload for {self.key}: {str(e)}")
+        self.pending.clear()
+        self.close()
+
 def lambda_handler(event, context):
     print("Starting student report generation")
     
@@ -24,10 +137,14 @@ def lambda_handler(event, context):
             student_id = body.get('student_id')
             days_back = body.get('days', 90)
             report_type = body.get('report_type', 'detailed')
+            inline = body.get('inline', False)
+            limit = body.get('limit')
         else:
             student_id = event.get('student_id')
             days_back = event.get('days', 90)
             report_type = event.get('report_type', 'detailed')
+            inline = event.get('inline', False)
+            limit = event.get('limit')
         
         if not student_id:
             return {
@@ -44,23 +161,16 @@ def lambda_handler(event, context):
         
         print(f"Generating {report_type} student report for: {student_id}")
         
-        # Get student's submissions using GSI
-        submissions_table = dynamodb.Table('Submissions-dev')
+        # Get student's submissions using GSI (date window pushed into the sort key range).
+        # submitted_at is written with datetime.now().isoformat(), so the cutoff uses the same
+        # format and compares lexicographically on the sort key.
+        days_back = int(days_back or 0)
+        cutoff_iso = (datetime.now() - timedelta(days=days_back)).isoformat() if days_back > 0 else None
+        limit = int(limit) if limit else None
         
-        # Query using GSI - no date filter since submitted_at is the sort key
-        response = submissions_table.query(
-            IndexName='StudentSubmissionIndex',
-            KeyConditionExpression=boto3.dynamodb.conditions.Key('student_id').eq(student_id)
+        submissions = convert_decimals_to_floats(
+            query_student_submissions(submissions_table, student_id, cutoff_iso, limit)
         )
-        submissions = convert_decimals_to_floats(response.get('Items', []))
-        
-        # Filter by date in code (after query)
-        if days_back > 0:
-            cutoff_date = datetime.now() - timedelta(days=days_back)
-            submissions = [
-                sub for sub in submissions 
-                if sub.get('submitted_at') and datetime.fromisoformat(sub['submitted_at'].replace('Z', '+00:00')) >= cutoff_date
-            ]
         
         if not submissions:
             return {
@@ -81,29 +191,58 @@ def lambda_handler(event, context):
         student_name = submissions[0].get('student_name', 'Student')
         student_email = submissions[0].get('student_email', '')
         
-        # Generate student report
-        if report_type == 'detailed':
-            csv_buffer = generate_detailed_student_report(student_id, student_name, submissions)
-            file_suffix = 'detailed'
-        else:
-            csv_buffer = generate_summary_student_report(student_id, student_name, submissions)
-            file_suffix = 'summary'
+        # Fetch assignment details once and precompute per-submission fields
+        assignment_map = batch_get_assignment_details({s['assignment_id'] for s in submissions})
+        submissions = enrich_submissions(submissions, assignment_map)
         
-        # Upload to S3
+        # Stream the student report to S3 as rows are generated
+        file_suffix = 'detailed' if report_type == 'detailed' else 'summary'
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         report_key = f"reports/student-reports/{student_id}_{file_suffix}_{timestamp}.csv"
         
-        s3.put_object(
-            Bucket='assignment-system-dev',
-            Key=report_key,
-            Body=csv_buffer.getvalue().encode('utf-8'),
-            ContentType='text/csv'
-        )
+        # Small reports can be returned directly in the response, skipping S3 entirely
+        csv_bytes = None
+        if inline:
+            _report_buffer.seek(0)
+            _report_buffer.truncate()
+            write_student_report(report_type, student_id, student_name, submissions, _report_buffer)
+            csv_bytes = _report_buffer.getvalue()
+            
+            if len(csv_bytes) <= INLINE_REPORT_MAX_BYTES:
+                print(f"Returning {len(csv_bytes)} byte report inline")
+                return {
+                    'statusCode': 200,
+                    'headers': {
+                        'Content-Type': 'text/csv',
+                        'Content-Disposition': f'attachment; filename="{student_id}_{file_suffix}_{timestamp}.csv"',
+                        'Access-Control-Allow-Origin': '*'
+                    },
+                    'body': base64.b64encode(csv_bytes).decode('ascii'),
+                    'isBase64Encoded': True
+                }
+            print(f"Report is {len(csv_bytes)} bytes, too large to inline; uploading to S3")
         
-        # Generate performance analytics
-        analytics = generate_student_analytics(submissions)
+        # Upload runs in the background while analytics are computed on this thread
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            if csv_bytes is not None:
+                upload_future = executor.submit(
+                    s3.put_object,
+                    Bucket='assignment-system-dev',
+                    Key=report_key,
+                    Body=csv_bytes,
+                    ContentType='text/csv'
+                )
+            else:
+                upload_future = executor.submit(
+                    upload_student_report, report_type, student_id, student_name, submissions, report_key
+                )
+            
+            # Generate performance analytics
+            analytics = generate_student_analytics(submissions)
+            
+            upload_future.result()
         
-        # Send email notification if student email is available
+        # Send email notification if student email is available (only once the report exists)
         if student_email:
             send_student_report_email(student_id, report_key, student_name, student_email)
         
@@ -141,10 +280,164 @@ def lambda_handler(event, context):
             })
         }
 
-def generate_detailed_student_report(student_id, student_name, submissions):
-    """Generate detailed student report"""
-    output = io.StringIO()
-    writer = csv.writer(output)
+def write_student_report(report_type, student_id, student_name, submissions, output):
+    """Write the requested report type into a binary stream"""
+    if report_type == 'detailed':
+        generate_detailed_student_report(student_id, student_name, submissions, output)
+    else:
+        generate_summary_student_report(student_id, student_name, submissions, output)
+
+def upload_student_report(report_type, student_id, student_name, submissions, report_key):
+    """Generate the requested report and stream it to S3"""
+    report_upload = S3StreamingUpload('assignment-system-dev', report_key, 'text/csv')
+    try:
+        write_student_report(report_type, student_id, student_name, submissions, report_upload)
+        report_upload.complete()
+    except Exception:
+        report_upload.abort()
+        raise
+
+def query_student_submissions(submissions_table, student_id, cutoff_iso=None, limit=None):
+    """Query a student's submissions (optionally the latest `limit`), oldest first"""
+    key_condition = boto3.dynamodb.conditions.Key('student_id').eq(student_id)
+    
+    if limit:
+        return query_latest_submissions(submissions_table, key_condition, cutoff_iso, limit)
+    if cutoff_iso:
+        return query_submission_segments(submissions_table, key_condition, cutoff_iso)
+    return query_submissions_bidirectional(submissions_table, key_condition)
+
+def submission_query_kwargs(key_condition, scan_forward=True):
+    """Base StudentSubmissionIndex query arguments"""
+    return {
+        'IndexName': 'StudentSubmissionIndex',
+        'KeyConditionExpression': key_condition,
+        'ProjectionExpression': SUBMISSION_PROJECTION,
+        'ExpressionAttributeNames': SUBMISSION_PROJECTION_NAMES,
+        'ScanIndexForward': scan_forward
+    }
+
+def query_all_pages(submissions_table, query_kwargs):
+    """Follow LastEvaluatedKey until the query is exhausted"""
+    items = []
+    while True:
+        response = submissions_table.query(**query_kwargs)
+        items.extend(response.get('Items', []))
+        last_key = response.get('LastEvaluatedKey')
+        if not last_key:
+            return items
+        query_kwargs['ExclusiveStartKey'] = last_key
+
+def merge_submissions(items):
+    """Drop duplicates returned by overlapping queries and sort by submitted_at ascending"""
+    merged = {}
+    for item in items:
+        merged[item.get('submission_id') or (item.get('student_id'), item.get('submitted_at'))] = item
+    
+    return sorted(merged.values(), key=lambda item: item.get('submitted_at', ''))
+
+def query_latest_submissions(submissions_table, key_condition, cutoff_iso, limit):
+    """Read only the newest `limit` submissions, newest first, with a matching page size"""
+    if cutoff_iso:
+        key_condition = key_condition & boto3.dynamodb.conditions.Key('submitted_at').gte(cutoff_iso)
+    
+    query_kwargs = submission_query_kwargs(key_condition, scan_forward=False)
+    items = []
+    while len(items) < limit:
+        query_kwargs['Limit'] = limit - len(items)
+        response = submissions_table.query(**query_kwargs)
+        items.extend(response.get('Items', []))
+        last_key = response.get('LastEvaluatedKey')
+        if not last_key:
+            break
+        query_kwargs['ExclusiveStartKey'] = last_key
+    
+    return merge_submissions(items[:limit])
+
+def query_submission_segments(submissions_table, key_condition, cutoff_iso):
+    """Split [cutoff, now] into sort key sub-ranges and query them in parallel"""
+    start = datetime.fromisoformat(cutoff_iso)
+    step = (datetime.now() - start) / SUBMISSION_QUERY_SEGMENTS
+    bounds = [(start + step * i).isoformat() for i in range(SUBMISSION_QUERY_SEGMENTS)]
+    
+    # between() is inclusive, so boundary items may come back twice; merge_submissions dedupes.
+    # The last range is open-ended so nothing submitted after "now" is missed.
+    sort_key = boto3.dynamodb.conditions.Key('submitted_at')
+    conditions = [
+        key_condition & sort_key.between(lower, upper)
+        for lower, upper in zip(bounds, bounds[1:])
+    ]
+    conditions.append(key_condition & sort_key.gte(bounds[-1]))
+    
+    with ThreadPoolExecutor(max_workers=len(conditions)) as executor:
+        pages = executor.map(
+            lambda condition: query_all_pages(submissions_table, submission_query_kwargs(condition)),
+            conditions
+        )
+        items = [item for page in pages for item in page]
+    
+    return merge_submissions(items)
+
+def query_submissions_bidirectional(submissions_table, key_condition):
+    """Query a student's submissions from both ends of the sort key range in parallel"""
+    # Last submitted_at seen by each direction. Stop only once they strictly cross: on equal values
+    # either side may still have unread ties at that submitted_at.
+    frontier = {'forward': None, 'backward': None}
+    lock = threading.Lock()
+    done = threading.Event()
+    
+    def fetch(direction, scan_forward):
+        items = []
+        query_kwargs = submission_query_kwargs(key_condition, scan_forward)
+        
+        while not done.is_set():
+            response = submissions_table.query(**query_kwargs)
+            page = response.get('Items', [])
+            items.extend(page)
+            
+            with lock:
+                if page:
+                    frontier[direction] = page[-1].get('submitted_at', '')
+                forward, backward = frontier['forward'], frontier['backward']
+                if forward is not None and backward is not None and forward > backward:
+                    done.set()
+            
+            last_key = response.get('LastEvaluatedKey')
+            if not last_key:
+                done.set()
+                break
+            query_kwargs['ExclusiveStartKey'] = last_key
+        
+        return items
+    
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        forward_future = executor.submit(fetch, 'forward', True)
+        backward_future = executor.submit(fetch, 'backward', False)
+        forward_items = forward_future.result()
+        backward_items = backward_future.result()
+    
+    # Merge both halves, dropping the overlap, in ascending submitted_at order
+    return merge_submissions(forward_items + backward_items)
+
+def enrich_submissions(submissions, assignment_map):
+    """Attach assignment details, percentage and grade to each submission (computed once)"""
+    for submission in submissions:
+        assignment = assignment_map.get(submission['assignment_id'], {})
+        max_score = submission.get('max_score', 100)
+        final_score = submission.get('final_score', 0)
+        percentage = (final_score / max_score * 100) if max_score > 0 else 0
+        
+        submission['_assignment'] = assignment
+        submission['_subject'] = assignment.get('subject', 'Unknown')
+        submission['_percentage'] = percentage
+        submission['_grade'] = calculate_grade(percentage)
+    
+    return submissions
+
+def generate_detailed_student_report(student_id, student_name, submissions, output):
+    """Generate detailed student report into a binary stream"""
+    text_stream = io.TextIOWrapper(output, encoding='utf-8', newline='')
+    writer = csv.writer(text_stream)
     
     # Write header
     writer.writerow([
@@ -154,35 +447,33 @@ def generate_detailed_student_report(student_id, student_name, submissions):
         'Status', 'Overall Feedback'
     ])
     
-    # Write data rows
-    for submission in submissions:
-        assignment = get_assignment_details(submission['assignment_id'])
-        max_score = submission.get('max_score', 100)
-        final_score = submission.get('final_score', 0)
-        percentage = (final_score / max_score * 100) if max_score > 0 else 0
-        grade = calculate_grade(percentage)
-        
-        writer.writerow([
+    # Write data rows in one writerows call (row loop runs inside the C csv writer)
+    writer.writerows(
+        (
             submission['assignment_id'],
-            assignment.get('subject', 'Unknown'),
-            assignment.get('topic', ''),
-            assignment.get('teacher_name', ''),
-            final_score,
-            max_score,
-            f"{percentage:.2f}%",
-            grade,
+            submission['_subject'],
+            submission['_assignment'].get('topic', ''),
+            submission['_assignment'].get('teacher_name', ''),
+            submission.get('final_score', 0),
+            submission.get('max_score', 100),
+            f"{submission['_percentage']:.2f}%",
+            submission['_grade'],
             submission.get('submitted_at', ''),
             submission.get('evaluated_at', ''),
             submission.get('evaluation_status', 'pending'),
             get_overall_feedback(submission)
-        ])
+        )
+        for submission in submissions
+    )
     
-    return output
+    # Detach so the wrapper doesn't close the underlying stream when collected
+    text_stream.flush()
+    text_stream.detach()
 
-def generate_summary_student_report(student_id, student_name, submissions):
-    """Generate summary student report"""
-    output = io.StringIO()
-    writer = csv.writer(output)
+def generate_summary_student_report(student_id, student_name, submissions, output):
+    """Generate summary student report into a binary stream"""
+    text_stream = io.TextIOWrapper(output, encoding='utf-8', newline='')
+    writer = csv.writer(text_stream)
     
     # Write header for summary report
     writer.writerow([
@@ -191,42 +482,41 @@ def generate_summary_student_report(student_id, student_name, submissions):
     ])
     
     # Group by subject
-    subject_data = {}
+    subject_scores = {}
     for submission in submissions:
-        assignment = get_assignment_details(submission['assignment_id'])
-        subject = assignment.get('subject', 'Unknown')
-        
-        if subject not in subject_data:
-            subject_data[subject] = {
-                'scores': [],
-                'count': 0
-            }
-        
-        final_score = submission.get('final_score', 0)
-        max_score = submission.get('max_score', 100)
-        percentage = (final_score / max_score * 100) if max_score > 0 else 0
-        
-        subject_data[subject]['scores'].append(percentage)
-        subject_data[subject]['count'] += 1
+        subject_scores.setdefault(submission['_subject'], []).append(submission['_percentage'])
     
     # Write subject-wise summary
-    for subject, data in subject_data.items():
-        avg_score = sum(data['scores']) / len(data['scores'])
-        highest = max(data['scores'])
-        lowest = min(data['scores'])
+    for subject, scores in subject_scores.items():
+        count = len(scores)
+        half = count // 2
+        
+        # Single pass for total, extremes and the first-half sum used by the trend
+        total = first_half_sum = 0
+        highest = lowest = scores[0]
+        for idx, score in enumerate(scores):
+            total += score
+            if idx < half:
+                first_half_sum += score
+            if score > highest:
+                highest = score
+            elif score < lowest:
+                lowest = score
+        
+        avg_score = total / count
         overall_grade = calculate_grade(avg_score)
         
         # Simple trend calculation
-        if len(data['scores']) > 1:
-            first_half_avg = sum(data['scores'][:len(data['scores'])//2]) / (len(data['scores'])//2)
-            second_half_avg = sum(data['scores'][len(data['scores'])//2:]) / (len(data['scores']) - len(data['scores'])//2)
+        if count > 1:
+            first_half_avg = first_half_sum / half
+            second_half_avg = (total - first_half_sum) / (count - half)
             trend = 'Improving' if second_half_avg > first_half_avg else 'Stable'
         else:
             trend = 'Stable'
         
         writer.writerow([
             subject,
-            data['count'],
+            count,
             f"{avg_score:.2f}%",
             f"{highest:.2f}%",
             f"{lowest:.2f}%",
@@ -234,17 +524,61 @@ def generate_summary_student_report(student_id, student_name, submissions):
             trend
         ])
     
-    return output
+    # Detach so the wrapper doesn't close the underlying stream when collected
+    text_stream.flush()
+    text_stream.detach()
 
-def get_assignment_details(assignment_id):
-    """Get assignment details from DynamoDB"""
+def batch_get_assignment_details(assignment_ids):
+    """Get assignment details for many assignments, via the warm cache then BatchGetItem"""
+    assignment_map = {}
+    now = time.monotonic()
+    
+    # Serve fresh entries from the cache, fetch only the misses
+    missing_ids = []
+    for aid in assignment_ids:
+        cached = _assignment_cache.get(aid)
+        if cached and now - cached[0] < ASSIGNMENT_CACHE_TTL:
+            assignment_map[aid] = cached[1]
+        else:
+            missing_ids.append(aid)
+    
     try:
-        table = dynamodb.Table('Assignments-dev')
-        response = table.get_item(Key={'assignment_id': assignment_id})
-        return convert_decimals_to_floats(response.get('Item', {}))
+        # BatchGetItem accepts at most 100 keys per request
+        for i in range(0, len(missing_ids), 100):
+            request_items = {
+                'Assignments-dev': {
+                    'Keys': [{'assignment_id': aid} for aid in missing_ids[i:i + 100]],
+                    'ProjectionExpression': 'assignment_id, subject, topic, teacher_name'
+                }
+            }
+            
+            attempt = 0
+            while request_items:
+                response = dynamodb.batch_get_item(RequestItems=request_items)
+                for item in response.get('Responses', {}).get('Assignments-dev', []):
+                    details = convert_decimals_to_floats(item)
+                    assignment_map[item['assignment_id']] = details
+                    cache_assignment_details(item['assignment_id'], details, now)
+                
+                request_items = response.get('UnprocessedKeys') or {}
+                if request_items:
+                    if attempt >= 5:
+                        print(f"Giving up on {len(request_items['Assignments-dev']['Keys'])} unprocessed assignment keys")
+                        break
+                    # Exponential backoff before retrying throttled keys
+                    time.sleep(min(0.05 * (2 ** attempt), 1.0))
+                    attempt += 1
     except Exception as e:
-        print(f"Error getting assignment details for {assignment_id}: {str(e)}")
-        return {}
+        print(f"Error getting assignment details: {str(e)}")
+    
+    return assignment_map
+
+def cache_assignment_details(assignment_id, details, fetched_at):
+    """Store assignment details in the warm cache, evicting the oldest entries when full"""
+    _assignment_cache[assignment_id] = (fetched_at, details)
+    _assignment_cache.move_to_end(assignment_id)
+    while len(_assignment_cache) > ASSIGNMENT_CACHE_MAX:
+        _assignment_cache.popitem(last=False)
 
 def get_overall_feedback(submission):
     """Extract overall feedback from submission"""
@@ -259,26 +593,26 @@ def generate_student_analytics(submissions):
     if not submissions:
         return {}
     
-    scores = []
+    # Single pass with running totals; no per-score lists are materialised
     completed_assignments = 0
-    subject_performance = {}
+    total_score = 0
+    subject_totals = {}  # subject -> [sum, count]
     
     for submission in submissions:
         if submission.get('evaluation_status') == 'completed':
             completed_assignments += 1
-            final_score = submission.get('final_score', 0)
-            max_score = submission.get('max_score', 100)
-            percentage = (final_score / max_score * 100) if max_score > 0 else 0
-            scores.append(percentage)
+            percentage = submission['_percentage']
+            total_score += percentage
             
             # Track subject performance
-            assignment = get_assignment_details(submission['assignment_id'])
-            subject = assignment.get('subject', 'Unknown')
-            if subject not in subject_performance:
-                subject_performance[subject] = []
-            subject_performance[subject].append(percentage)
+            totals = subject_totals.get(submission['_subject'])
+            if totals is None:
+                subject_totals[submission['_subject']] = [percentage, 1]
+            else:
+                totals[0] += percentage
+                totals[1] += 1
     
-    if not scores:
+    if not completed_assignments:
         return {
             'total_assignments': len(submissions),
             'completed_assignments': 0,
@@ -287,13 +621,14 @@ def generate_student_analytics(submissions):
             'overall_grade': 'N/A'
         }
     
-    avg_score = sum(scores) / len(scores)
+    avg_score = total_score / completed_assignments
     overall_grade = calculate_grade(avg_score)
     
     # Calculate subject averages
-    subject_averages = {}
-    for subject, subject_scores in subject_performance.items():
-        subject_averages[subject] = round(sum(subject_scores) / len(subject_scores), 2)
+    subject_averages = {
+        subject: round(subject_sum / subject_count, 2)
+        for subject, (subject_sum, subject_count) in subject_totals.items()
+    }
     
     return {
         'total_assignments': len(submissions),
@@ -307,46 +642,35 @@ def generate_student_analytics(submissions):
 
 def send_student_report_email(student_id, report_key, student_name, student_email):
     """Send email notification when student report is ready"""
-    lambda_client = boto3.client('lambda')
-    
     try:
         report_url = f"https://assignment-system-dev.s3.amazonaws.com/{report_key}"
+        payload = json.dumps({
+            'email_type': 'report_ready',
+            'to_emails': [student_email],
+            'report_type': 'student_report',
+            'report_url': report_url,
+            'student_name': student_name
+        })
         
-        lambda_client.invoke(
-            FunctionName='EmailService-dev',
-            InvocationType='Event',
-            Payload=json.dumps({
-                'email_type': 'report_ready',
-                'to_emails': [student_email],
-                'report_type': 'student_report',
-                'report_url': report_url,
-                'student_name': student_name
-            })
-        )
+        if REPORT_READY_TOPIC_ARN:
+            sns_client.publish(TopicArn=REPORT_READY_TOPIC_ARN, Message=payload)
+        else:
+            lambda_client.invoke(
+                FunctionName='EmailService-dev',
+                InvocationType='Event',
+                Payload=payload
+            )
         print(f"✅ Student report notification email triggered for {student_email}")
     except Exception as e:
         print(f"⚠️ Failed to trigger student email notification: {str(e)}")
 
 def calculate_grade(percentage):
     """Calculate grade from percentage"""
-    if percentage >= 90: return 'A+'
-    elif percentage >= 85: return 'A'
-    elif percentage >= 80: return 'A-'
-    elif percentage >= 75: return 'B+'
-    elif percentage >= 70: return 'B'
-    elif percentage >= 65: return 'B-'
-    elif percentage >= 60: return 'C+'
-    elif percentage >= 55: return 'C'
-    elif percentage >= 50: return 'C-'
-    elif percentage >= 45: return 'D'
-    else: return 'F'
+    return GRADES[bisect.bisect_right(GRADE_THRESHOLDS, percentage)]
 
 def get_performance_band(percentage):
     """Get performance band description"""
-    if percentage >= 85: return 'Excellent'
-    elif percentage >= 70: return 'Good'
-    elif percentage >= 60: return 'Average'
-    else: return 'Needs Improvement'
+    return PERFORMANCE_BANDS[bisect.bisect_right(PERFORMANCE_BAND_THRESHOLDS, percentage)]
 
 def convert_decimals_to_floats(obj):
     """Convert Decimal objects to float for JSON serialization"""
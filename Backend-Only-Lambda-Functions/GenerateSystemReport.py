@@ -1,11 +1,89 @@
+import os
 import json
 import boto3
+import time
 import csv
 import io
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from botocore.config import Config
 
-dynamodb = boto3.resource('dynamodb')
-s3 = boto3.client('s3')
+boto_config = Config(
+    max_pool_connections=50,
+    retries={'max_attempts': 3, 'mode': 'adaptive'},
+    tcp_keepalive=True
+)
+
+dynamodb = boto3.resource('dynamodb', config=boto_config)
+s3 = boto3.client('s3', config=boto_config)
+
+submissions_table = dynamodb.Table('Submissions-dev')
+assignments_table = dynamodb.Table('Assignments-dev')
+
+# Opt-in: when set, period metrics come from the daily rollups kept by SystemMetricsAggregator; unset keeps the GSI queries
+SYSTEM_METRICS_TABLE = os.environ.get('SYSTEM_METRICS_TABLE')
+
+class S3StreamingUpload(io.RawIOBase):
+    """Writable binary stream that uploads to S3 in multipart chunks as data is written"""
+    PART_SIZE = 5 * 1024 * 1024  # S3 minimum size for every part but the last
+    
+    def __init__(self, bucket, key, content_type):
+        super().__init__()
+        self.bucket = bucket
+        self.key = key
+        self.content_type = content_type
+        self.pending = bytearray()
+        self.parts = []
+        self.upload_id = None
+    
+    def writable(self):
+        return True
+    
+    def write(self, data):
+        self.pending.extend(data)
+        if len(self.pending) >= self.PART_SIZE:
+            self._upload_part()
+        return len(data)
+    
+    def _upload_part(self):
+        if self.upload_id is None:
+            self.upload_id = s3.create_multipart_upload(
+                Bucket=self.bucket, Key=self.key, ContentType=self.content_type
+            )['UploadId']
+        
+        part_number = len(self.parts) + 1
+        response = s3.upload_part(
+            Bucket=self.bucket, Key=self.key, UploadId=self.upload_id,
+            PartNumber=part_number, Body=bytes(self.pending)
+        )
+        self.parts.append({'ETag': response['ETag'], 'PartNumber': part_number})
+        self.pending.clear()
+    
+    def complete(self):
+        """Finish the upload; small objects that never filled a part go up as a single PUT"""
+        if self.upload_id is None:
+            s3.put_object(
+                Bucket=self.bucket, Key=self.key,
+                Body=bytes(self.pending), ContentType=self.content_type
+            )
+        else:
+            if self.pending:
+                self._upload_part()
+            s3.complete_multipart_upload(
+                Bucket=self.bucket, Key=self.key, UploadId=self.upload_id,
+                MultipartUpload={'Parts': self.parts}
+            )
+        self.pending.clear()
+        self.close()
+    
+    def abort(self):
+        """Discard any parts already uploaded"""
+        if self.upload_id is not None:
+            try:
+                s3.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self.upload_id)
+            except Exception as e:
+                print(f"Failed to abort multipart upload for {self.key}: {str(e)}")
+        self.pending.clear()
+        self.close()
 
 def lambda_handler(event, context):
     try:
@@ -17,19 +95,17 @@ def lambda_handler(event, context):
         elif report_type == 'monthly':
             days_back = 30
         
-        # Generate system report
-        csv_buffer = generate_system_report(days_back)
-        
-        # Upload to S3 with new folder structure
+        # Stream the system report to S3 with new folder structure
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         report_key = f"reports/system-reports/{report_type}_system_report_{timestamp}.csv"
         
-        s3.put_object(
-            Bucket='assignment-system-dev',
-            Key=report_key,
-            Body=csv_buffer.getvalue().encode('utf-8'),
-            ContentType='text/csv'
-        )
+        report_upload = S3StreamingUpload('assignment-system-dev', report_key, 'text/csv')
+        try:
+            generate_system_report(days_back, report_upload)
+            report_upload.complete()
+        except Exception:
+            report_upload.abort()
+            raise
         
         return {
             'statusCode': 200,
@@ -59,9 +135,9 @@ def lambda_handler(event, context):
             })
         }
 
-def generate_system_report(days_back):
-    output = io.StringIO()
-    writer = csv.writer(output)
+def generate_system_report(days_back, output):
+    text_stream = io.TextIOWrapper(output, encoding='utf-8', newline='')
+    writer = csv.writer(text_stream)
     
     # Write header
     writer.writerow([
@@ -77,18 +153,26 @@ def generate_system_report(days_back):
     # Get system metrics
     metrics = calculate_system_metrics(start_date, end_date, previous_start, start_date)
     
+    # Row-invariant columns are formatted once
+    date_range = f"{start_date:%Y-%m-%d} to {end_date:%Y-%m-%d}"
+    generated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    
     # Write metrics
-    for metric_name, values in metrics.items():
-        writer.writerow([
+    writer.writerows(
+        (
             metric_name,
             values['current'],
             values['previous'],
             values['change_percentage'],
-            f"{start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}",
-            datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        ])
+            date_range,
+            generated_at
+        )
+        for metric_name, values in metrics.items()
+    )
     
-    return output
+    # Detach so the wrapper doesn't close the underlying stream when collected
+    text_stream.flush()
+    text_stream.detach()
 
 def calculate_system_metrics(current_start, current_end, previous_start, previous_end):
     # Get current period data
@@ -110,39 +194,32 @@ def calculate_system_metrics(current_start, current_end, previous_start, previou
     return metrics
 
 def get_period_metrics(start_date, end_date):
-    dynamodb = boto3.resource('dynamodb')
+    if SYSTEM_METRICS_TABLE:
+        return get_rollup_period_metrics(start_date, end_date)
     
-    # Get submissions count
-    submissions_table = dynamodb.Table('Submissions-dev')
-    submissions_response = submissions_table.scan(
-        FilterExpression=boto3.dynamodb.conditions.Attr('submitted_at').between(
-            start_date.isoformat(), end_date.isoformat()
-        )
+    # Get submissions in the window (single query, counts derived in-memory)
+    submissions = query_date_range(
+        submissions_table, 'DateSubmissionIndex',
+        'submission_date_bucket', 'submitted_at',
+        start_date, end_date,
+        'submitted_at, evaluated_at, evaluation_status'
     )
-    submissions_count = len(submissions_response.get('Items', []))
+    submissions_count = len(submissions)
     
     # Get assignments count
-    assignments_table = dynamodb.Table('Assignments-dev')
-    assignments_response = assignments_table.scan(
-        FilterExpression=boto3.dynamodb.conditions.Attr('created_at').between(
-            start_date.isoformat(), end_date.isoformat()
-        )
+    assignments = query_date_range(
+        assignments_table, 'DateAssignmentIndex',
+        'created_date_bucket', 'created_at',
+        start_date, end_date,
+        'created_at'
     )
-    assignments_count = len(assignments_response.get('Items', []))
+    assignments_count = len(assignments)
     
     # Get evaluated submissions count
-    evaluated_response = submissions_table.scan(
-        FilterExpression=(
-            boto3.dynamodb.conditions.Attr('submitted_at').between(
-                start_date.isoformat(), end_date.isoformat()
-            ) &
-            boto3.dynamodb.conditions.Attr('evaluation_status').eq('completed')
-        )
-    )
-    evaluated_count = len(evaluated_response.get('Items', []))
+    evaluated_count = sum(1 for s in submissions if s.get('evaluation_status') == 'completed')
     
     # Calculate average evaluation time (simplified)
-    avg_evaluation_time = calculate_avg_evaluation_time(submissions_response.get('Items', []))
+    avg_evaluation_time = calculate_avg_evaluation_time(submissions)
     
     return {
         'Total Submissions': submissions_count,
@@ -152,19 +229,125 @@ def get_period_metrics(start_date, end_date):
         'Average Evaluation Time (hours)': avg_evaluation_time
     }
 
+def get_rollup_period_metrics(start_date, end_date):
+    """Sum the precomputed daily rollups for every day in (start_date, end_date]"""
+    totals = {
+        'submissions_count': 0,
+        'assignments_count': 0,
+        'evaluated_count': 0,
+        'evaluation_time_sum': 0,
+        'evaluation_time_count': 0
+    }
+    
+    for row in batch_get_daily_metrics(day_keys(start_date, end_date)):
+        for counter in totals:
+            totals[counter] += float(row.get(counter, 0))
+    
+    submissions_count = int(totals['submissions_count'])
+    evaluated_count = int(totals['evaluated_count'])
+    evaluation_time_count = totals['evaluation_time_count']
+    
+    return {
+        'Total Submissions': submissions_count,
+        'New Assignments': int(totals['assignments_count']),
+        'Evaluated Submissions': evaluated_count,
+        'Evaluation Rate (%)': (evaluated_count / submissions_count * 100) if submissions_count > 0 else 0,
+        'Average Evaluation Time (hours)': round(totals['evaluation_time_sum'] / 3600 / evaluation_time_count, 2) if evaluation_time_count > 0 else 0
+    }
+
+def day_keys(start_date, end_date):
+    """List the YYYY-MM-DD rollup keys for the days after start_date through end_date"""
+    # Half-open so a window is exactly (end - start) days and adjacent windows share no day
+    days = []
+    day = start_date.date() + timedelta(days=1)
+    while day <= end_date.date():
+        days.append(day.isoformat())
+        day += timedelta(days=1)
+    return days
+
+def batch_get_daily_metrics(metric_dates):
+    """Fetch daily rollup rows with BatchGetItem, retrying unprocessed keys with backoff"""
+    rows = []
+    
+    # BatchGetItem accepts at most 100 keys per request
+    for i in range(0, len(metric_dates), 100):
+        request_items = {
+            SYSTEM_METRICS_TABLE: {
+                'Keys': [{'metric_date': metric_date} for metric_date in metric_dates[i:i + 100]]
+            }
+        }
+        
+        attempt = 0
+        while request_items:
+            response = dynamodb.batch_get_item(RequestItems=request_items)
+            rows.extend(response.get('Responses', {}).get(SYSTEM_METRICS_TABLE, []))
+            
+            request_items = response.get('UnprocessedKeys') or {}
+            if request_items:
+                if attempt >= 5:
+                    raise RuntimeError(f"Could not read {len(request_items[SYSTEM_METRICS_TABLE]['Keys'])} daily metric rows")
+                # Exponential backoff before retrying throttled keys
+                time.sleep(min(0.05 * (2 ** attempt), 1.0))
+                attempt += 1
+    
+    return rows
+
+def month_buckets(start_date, end_date):
+    """List the YYYY-MM date buckets covering [start_date, end_date]"""
+    buckets = []
+    year, month = start_date.year, start_date.month
+    while (year, month) <= (end_date.year, end_date.month):
+        buckets.append(f"{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return buckets
+
+def query_date_range(table, index_name, bucket_attr, sort_attr, start_date, end_date, projection):
+    """Query a date-bucketed GSI for all items with sort_attr in [start_date, end_date]"""
+    key = boto3.dynamodb.conditions.Key
+    items = []
+    
+    for bucket in month_buckets(start_date, end_date):
+        query_kwargs = {
+            'IndexName': index_name,
+            'KeyConditionExpression': key(bucket_attr).eq(bucket) & key(sort_attr).between(
+                start_date.isoformat(), end_date.isoformat()
+            ),
+            'ProjectionExpression': projection
+        }
+        
+        while True:
+            response = table.query(**query_kwargs)
+            items.extend(response.get('Items', []))
+            
+            last_key = response.get('LastEvaluatedKey')
+            if not last_key:
+                break
+            query_kwargs['ExclusiveStartKey'] = last_key
+    
+    return items
+
+def parse_iso_timestamp(value):
+    """Parse an ISO-8601 timestamp as naive UTC (writers use datetime.now().isoformat() on Lambda)"""
+    if value.endswith('Z'):
+        return datetime.fromisoformat(value[:-1])
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
 def calculate_avg_evaluation_time(submissions):
-    total_time = 0
+    total_seconds = 0
     count = 0
     
     for submission in submissions:
-        if submission.get('submitted_at') and submission.get('evaluated_at'):
+        submitted_at = submission.get('submitted_at')
+        evaluated_at = submission.get('evaluated_at')
+        if submitted_at and evaluated_at:
             try:
-                submitted = datetime.fromisoformat(submission['submitted_at'].replace('Z', '+00:00'))
-                evaluated = datetime.fromisoformat(submission['evaluated_at'].replace('Z', '+00:00'))
-                time_diff = (evaluated - submitted).total_seconds() / 3600  # Convert to hours
-                total_time += time_diff
+                total_seconds += (parse_iso_timestamp(evaluated_at) - parse_iso_timestamp(submitted_at)).total_seconds()
                 count += 1
             except ValueError:
                 continue
     
-    return round(total_time / count, 2) if count > 0 else 0
+    # Convert to hours once
+    return round(total_seconds / 3600 / count, 2) if count > 0 else 0
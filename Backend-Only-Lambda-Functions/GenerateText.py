@@ -1,14 +1,12 @@
 import json
 import boto3
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 s3 = boto3.client('s3', region_name='us-east-1')
-dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
 
-TABLE_NAME = 'ContentTable'
 OUTPUT_BUCKET = 'sahayak-enhancer-output-02'
 
-table = dynamodb.Table(TABLE_NAME)
 
 def lambda_handler(event, context):
     """
@@ -21,37 +19,31 @@ def lambda_handler(event, context):
         
         print(f"Generating output files for {content_id}")
         
-        # Update progress
-        table.update_item(
-            Key={'contentId': content_id},
-            UpdateExpression='SET progress = :p, currentStep = :step',
-            ExpressionAttributeValues={
-                ':p': 80,
-                ':step': 'Generating output files'
-            }
-        )
-        
-        # Generate JSON output
+        # Generate JSON and Markdown outputs
         json_content = json.dumps(enhanced, indent=2, ensure_ascii=False)
         txt_key = f"{content_id}/enhanced.txt"
         
-        s3.put_object(
-            Bucket=OUTPUT_BUCKET,
-            Key=txt_key,
-            Body=json_content.encode('utf-8'),
-            ContentType='text/plain'
-        )
-        
-        # Generate Markdown output
         md_content = generate_markdown(enhanced)
         md_key = f"{content_id}/enhanced.md"
         
-        s3.put_object(
-            Bucket=OUTPUT_BUCKET,
-            Key=md_key,
-            Body=md_content.encode('utf-8'),
-            ContentType='text/markdown'
-        )
+        # Upload both files concurrently
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            txt_upload = executor.submit(
+                s3.put_object,
+                Bucket=OUTPUT_BUCKET,
+                Key=txt_key,
+                Body=json_content.encode('utf-8'),
+                ContentType='text/plain'
+            )
+            md_upload = executor.submit(
+                s3.put_object,
+                Bucket=OUTPUT_BUCKET,
+                Key=md_key,
+                Body=md_content.encode('utf-8'),
+                ContentType='text/markdown'
+            )
+            txt_upload.result()
+            md_upload.result()
         
         print(f"Uploaded files to s3://{OUTPUT_BUCKET}/{content_id}/")
         
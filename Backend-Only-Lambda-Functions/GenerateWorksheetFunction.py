@@ -28,6 +28,49 @@ PREMADE_TEMPLATES = {
     }
 }
 
+# ✅ Required fields
+REQUIRED_FIELDS = frozenset([
+    "teacherId", "classId", "subject", "chapter",
+    "topic", "difficulty", "language", "templateType"
+])
+
+def build_item(body):
+    """Validate a worksheet request and build its DynamoDB item (raises ValueError on bad input)"""
+    missing_fields = REQUIRED_FIELDS.difference(body)
+    if missing_fields:
+        raise ValueError(f"Missing fields: {', '.join(sorted(missing_fields))}")
+
+    # ✅ Handle template
+    template_type = body["templateType"]
+    if template_type in PREMADE_TEMPLATES:
+        template = PREMADE_TEMPLATES[template_type]
+    elif template_type == "CUSTOM":
+        if "template" not in body:
+            raise ValueError("Custom template requires 'template' field")
+        template = body["template"]
+    else:
+        raise ValueError("Invalid templateType")
+
+    # ✅ Generate worksheetId
+    worksheet_id = f"WS-{str(uuid.uuid4())[:8]}"
+
+    # ✅ Build DynamoDB item (always include contentId since it’s Sort Key)
+    return {
+        "worksheetId": worksheet_id,
+        "contentId": "NONE",   # required because contentId is Sort Key
+        "teacherId": body["teacherId"],
+        "classId": body["classId"],
+        "subject": body["subject"],
+        "chapter": body["chapter"],
+        "topic": body["topic"],
+        "difficulty": body["difficulty"],
+        "language": body["language"],
+        "templateType": template_type,
+        "template": template,
+        "status": "processing",
+        "createdAt": datetime.utcnow().isoformat()
+    }
+
 def lambda_handler(event, context):
     try:
         # Parse API Gateway event body
@@ -36,56 +79,45 @@ def lambda_handler(event, context):
         else:
             body = event
 
-        # ✅ Required fields
-        required_fields = [
-            "teacherId", "classId", "subject", "chapter", 
-            "topic", "difficulty", "language", "templateType"
-        ]
-        missing_fields = [f for f in required_fields if f not in body]
+        # ✅ Bulk creation: validate everything first, then write in 25-item batches
+        if isinstance(body.get("worksheets"), list):
+            try:
+                items = [build_item(w) for w in body["worksheets"]]
+            except ValueError as e:
+                return {
+                    "statusCode": 400,
+                    "body": json.dumps({"error": str(e)})
+                }
+
+            with table.batch_writer() as batch:
+                for item in items:
+                    batch.put_item(Item=item)
 
-        if missing_fields:
             return {
-                "statusCode": 400,
-                "body": json.dumps({"error": f"Missing fields: {', '.join(missing_fields)}"})
+                "statusCode": 200,
+                "body": json.dumps({
+                    "message": f"{len(items)} worksheet jobs created",
+                    "worksheets": [
+                        {
+                            "worksheetId": item["worksheetId"],
+                            "status": item["status"],
+                            "templateType": item["templateType"],
+                            "template": item["template"]
+                        }
+                        for item in items
+                    ]
+                })
             }
 
-        # ✅ Handle template
-        template_type = body["templateType"]
-        if template_type in PREMADE_TEMPLATES:
-            template = PREMADE_TEMPLATES[template_type]
-        elif template_type == "CUSTOM":
-            if "template" not in body:
-                return {
-                    "statusCode": 400,
-                    "body": json.dumps({"error": "Custom template requires 'template' field"})
-                }
-            template = body["template"]
-        else:
+        try:
+            item = build_item(body)
+        except ValueError as e:
             return {
                 "statusCode": 400,
-                "body": json.dumps({"error": "Invalid templateType"})
+                "body": json.dumps({"error": str(e)})
             }
 
-        # ✅ Generate worksheetId
-        worksheet_id = f"WS-{str(uuid.uuid4())[:8]}"
-
-        # ✅ Insert into DynamoDB (always include contentId since it’s Sort Key)
-        item = {
-            "worksheetId": worksheet_id,
-            "contentId": "NONE",   # required because contentId is Sort Key
-            "teacherId": body["teacherId"],
-            "classId": body["classId"],
-            "subject": body["subject"],
-            "chapter": body["chapter"],
-            "topic": body["topic"],
-            "difficulty": body["difficulty"],
-            "language": body["language"],
-            "templateType": template_type,
-            "template": template,
-            "status": "processing",
-            "createdAt": datetime.utcnow().isoformat()
-        }
-
+        # ✅ Insert into DynamoDB
         table.put_item(Item=item)
 
         # ✅ Return success
@@ -93,10 +125,10 @@ def lambda_handler(event, context):
             "statusCode": 200,
             "body": json.dumps({
                 "message": "Worksheet job created",
-                "worksheetId": worksheet_id,
+                "worksheetId": item["worksheetId"],
                 "status": "processing",
-                "templateType": template_type,
-                "template": template
+                "templateType": item["templateType"],
+                "template": item["template"]
             })
         }
 
@@ -1,6 +1,29 @@
 import json
 import boto3
 import decimal
+from boto3.dynamodb.conditions import Key
+from botocore.config import Config
+
+boto_config = Config(
+    max_pool_connections=50,
+    retries={'max_attempts': 3, 'mode': 'adaptive'},
+    tcp_keepalive=True
+)
+
+dynamodb = boto3.resource('dynamodb', config=boto_config)
+submissions_table = dynamodb.Table('Submissions-dev')
+
+# Response headers shared by every return path
+JSON_HEADERS = {
+    'Content-Type': 'application/json',
+    'Access-Control-Allow-Origin': '*'
+}
+
+def decimal_default(obj):
+    """Convert Decimal to int/float while json.dumps encodes the response"""
+    if isinstance(obj, decimal.Decimal):
+        return int(obj) if obj % 1 == 0 else float(obj)
+    raise TypeError
 
 def lambda_handler(event, context):
     print("Getting evaluation results")
@@ -19,10 +42,7 @@ def lambda_handler(event, context):
         if not submission_id:
             return {
                 'statusCode': 400,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*'
-                },
+                'headers': JSON_HEADERS,
                 'body': json.dumps({
                     'error': 'Missing required parameter',
                     'message': 'submission_id is required'
@@ -37,10 +57,7 @@ def lambda_handler(event, context):
         if not evaluation_data:
             return {
                 'statusCode': 404,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*'
-                },
+                'headers': JSON_HEADERS,
                 'body': json.dumps({
                     'error': 'Evaluation results not found',
                     'message': f'No evaluation data found for submission {submission_id}'
@@ -49,49 +66,40 @@ def lambda_handler(event, context):
         
         return {
             'statusCode': 200,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
+            'headers': JSON_HEADERS,
             'body': json.dumps({
                 'submission_id': submission_id,
                 'assignment_id': assignment_id,
                 'evaluation_data': evaluation_data,
                 'status': 'success'
-            })
+            }, default=decimal_default, separators=(',', ':'))
         }
         
     except Exception as e:
         print(f"Error getting evaluation results: {str(e)}")
         return {
             'statusCode': 500,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
+            'headers': JSON_HEADERS,
             'body': json.dumps({
                 'error': 'Failed to get evaluation results',
                 'message': str(e)
             })
         }
 
-# [Keep the existing get_evaluation_data and convert_decimals_to_floats functions]
 def get_evaluation_data(submission_id, assignment_id):
     """Get evaluation data from DynamoDB"""
-    dynamodb = boto3.resource('dynamodb')
-    table = dynamodb.Table('Submissions-dev')
-    
     try:
         if assignment_id:
             # Exact lookup with both keys
-            response = table.get_item(Key={
+            response = submissions_table.get_item(Key={
                 'submission_id': submission_id,
                 'assignment_id': assignment_id
             })
         else:
-            # Scan for submission_id (less efficient)
-            response = table.scan(
-                FilterExpression=boto3.dynamodb.conditions.Attr('submission_id').eq(submission_id)
+            # submission_id is the table's partition key, so query it instead of scanning
+            response = submissions_table.query(
+                KeyConditionExpression=Key('submission_id').eq(submission_id),
+                Limit=1
             )
             items = response.get('Items', [])
             if items:
@@ -101,7 +109,7 @@ def get_evaluation_data(submission_id, assignment_id):
         
         item = response.get('Item')
         if item:
-            return convert_decimals_to_floats({
+            return {
                 'student_name': item.get('student_name'),
                 'student_id': item.get('student_id'),
                 'final_score': item.get('final_score'),
@@ -111,20 +119,9 @@ def get_evaluation_data(submission_id, assignment_id):
                 'evaluation_results': item.get('evaluation_results', []),
                 'submission_type': item.get('submission_type'),
                 'submitted_at': item.get('submitted_at')
-            })
+            }
         return None
         
     except Exception as e:
         print(f"Error getting evaluation data: {str(e)}")
         return None
-
-def convert_decimals_to_floats(obj):
-    """Recursively convert Decimal objects to float"""
-    if isinstance(obj, list):
-        return [convert_decimals_to_floats(x) for x in obj]
-    elif isinstance(obj, dict):
-        return {k: convert_decimals_to_floats(v) for k, v in obj.items()}
-    elif isinstance(obj, decimal.Decimal):
-        return float(obj) if obj % 1 != 0 else int(obj)
-    else:
-        return obj
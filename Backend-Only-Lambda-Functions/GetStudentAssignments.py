@@ -1,37 +1,111 @@
+import os
 import json
+import time
 import boto3
 from decimal import Decimal
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from botocore.config import Config
 from boto3.dynamodb.conditions import Key, Attr
 
 boto_config = Config(
     retries=dict(max_attempts=3),
     read_timeout=300,
-    connect_timeout=300
+    connect_timeout=300,
+    max_pool_connections=50,
+    tcp_keepalive=True
 )
 
 dynamodb = boto3.resource('dynamodb', config=boto_config)
 
+# Concurrent per-assignment submission lookups (kept below max_pool_connections)
+SUBMISSION_LOOKUP_WORKERS = 16
+
+# Verbose request tracing (full event dumps, progress prints) only when LOG_LEVEL=DEBUG
+DEBUG = os.environ.get('LOG_LEVEL') == 'DEBUG'
+
+# Student records cached across warm invocations: student_id -> (fetched_at, item)
+STUDENT_CACHE_TTL = 300
+STUDENT_CACHE_MAX = 1024
+_student_cache = OrderedDict()
+
+# Response headers shared by every return path
+JSON_HEADERS = {
+    'Content-Type': 'application/json',
+    'Access-Control-Allow-Origin': '*'
+}
+PREFLIGHT_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Headers': 'Content-Type,Authorization',
+    'Access-Control-Allow-Methods': 'GET,OPTIONS'
+}
+CORS_HEADERS = {**JSON_HEADERS, **PREFLIGHT_HEADERS}
+
 def decimal_to_native(obj):
     """Convert Decimal objects to native Python types for JSON serialization"""
     if isinstance(obj, Decimal):
         return int(obj) if obj % 1 == 0 else float(obj)
     raise TypeError
 
+def get_student(users_table, student_id):
+    """Get the student's Users record, via the warm cache; None if not found"""
+    now = time.monotonic()
+    cached = _student_cache.get(student_id)
+    if cached and now - cached[0] < STUDENT_CACHE_TTL:
+        return cached[1]
+    
+    student_response = users_table.get_item(
+        Key={
+            'userId': student_id,
+            'role': 'student'
+        }
+    )
+    student = student_response.get('Item')
+    
+    # Only cache hits so newly registered students are found straight away
+    if student:
+        _student_cache[student_id] = (now, student)
+        _student_cache.move_to_end(student_id)
+        while len(_student_cache) > STUDENT_CACHE_MAX:
+            _student_cache.popitem(last=False)
+    return student
+
+def build_assignment_entry(assignment, student_class):
+    """Response entry for an assignment, initially marked pending"""
+    return {
+        'assignmentId': assignment.get('assignment_id'),
+        'title': assignment.get('title', 'Untitled Assignment'),
+        'subject': assignment.get('subject', 'General'),
+        'className': assignment.get('class_info', student_class),
+        'dueDate': assignment.get('due_date', ''),
+        'instructions': assignment.get('instructions', ''),
+        'status': 'pending',
+        'teacherId': assignment.get('teacher_id', ''),
+        'createdAt': assignment.get('created_at', '')
+    }
+
+def find_student_submission(submissions_table, assignment_id, student_id):
+    """Return the student's submission for an assignment, or None"""
+    submission_response = submissions_table.query(
+        KeyConditionExpression=Key('assignment_id').eq(assignment_id),
+        FilterExpression=Attr('student_id').eq(student_id),
+        ProjectionExpression='#s, score, feedback',
+        ExpressionAttributeNames={'#s': 'status'}
+    )
+    submissions = submission_response.get('Items', [])
+    return submissions[0] if submissions else None
+
 def lambda_handler(event, context):
     """Get all assignments for a specific student based on their class"""
-    print(f"Event: {json.dumps(event)}")
+    if DEBUG:
+        print(f"Event: {json.dumps(event)}")
     
     try:
         # Handle CORS preflight
         if event.get('httpMethod') == 'OPTIONS':
             return {
                 'statusCode': 200,
-                'headers': {
-                    'Access-Control-Allow-Origin': '*',
-                    'Access-Control-Allow-Headers': 'Content-Type,Authorization',
-                    'Access-Control-Allow-Methods': 'GET,OPTIONS'
-                },
+                'headers': PREFLIGHT_HEADERS,
                 'body': json.dumps({'message': 'OK'})
             }
         
@@ -41,152 +115,110 @@ def lambda_handler(event, context):
         if not student_id:
             return {
                 'statusCode': 400,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*'
-                },
+                'headers': JSON_HEADERS,
                 'body': json.dumps({'error': 'Missing studentId'})
             }
         
-        print(f"📚 Fetching assignments for student: {student_id}")
+        if DEBUG:
+            print(f"📚 Fetching assignments for student: {student_id}")
         
         # Step 1: Get student's class from Users table
         users_table = dynamodb.Table('Users')
-        student_response = users_table.get_item(
-            Key={
-                'userId': student_id,
-                'role': 'student'
-            }
-        )
+        student = get_student(users_table, student_id)
         
-        if 'Item' not in student_response:
+        if not student:
             return {
                 'statusCode': 404,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*'
-                },
+                'headers': JSON_HEADERS,
                 'body': json.dumps({'error': 'Student not found'})
             }
         
-        student = student_response['Item']
         student_class = student.get('classId')
         
         if not student_class:
             print(f"⚠️ Student {student_id} has no class assigned")
             return {
                 'statusCode': 200,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*'
-                },
+                'headers': JSON_HEADERS,
                 'body': json.dumps({
                     'success': True,
                     'assignments': [],
                     'message': 'No class assigned to student'
-                }, default=decimal_to_native)
+                }, default=decimal_to_native, separators=(',', ':'))
             }
         
-        print(f"👤 Student class: {student_class}")
+        if DEBUG:
+            print(f"👤 Student class: {student_class}")
         
         # Step 2: Get all assignments for the student's class
         assignments_table = dynamodb.Table('Assignments-dev')
         
-        # Scan for assignments with matching class
-        # Note: If you have many assignments, consider adding a GSI on class_info
-        assignments_response = assignments_table.scan(
-            FilterExpression=Attr('class_info').eq(student_class)
-        )
-        
-        assignments = assignments_response.get('Items', [])
+        # Query the ClassAssignments GSI (partition key class_info), following every page
+        query_kwargs = {
+            'IndexName': 'ClassAssignments',
+            'KeyConditionExpression': Key('class_info').eq(student_class),
+            'ProjectionExpression': 'assignment_id, title, subject, class_info, due_date, instructions, teacher_id, created_at'
+        }
+        assignments = []
+        while True:
+            assignments_response = assignments_table.query(**query_kwargs)
+            assignments.extend(assignments_response.get('Items', []))
+            
+            last_key = assignments_response.get('LastEvaluatedKey')
+            if not last_key:
+                break
+            query_kwargs['ExclusiveStartKey'] = last_key
         
-        print(f"✅ Found {len(assignments)} assignments for class {student_class}")
+        if DEBUG:
+            print(f"✅ Found {len(assignments)} assignments for class {student_class}")
         
         # Step 3: Get submission status for each assignment
         submissions_table = dynamodb.Table('Submissions')
         
+        # Look up all submissions concurrently instead of one round-trip at a time
+        with ThreadPoolExecutor(max_workers=min(SUBMISSION_LOOKUP_WORKERS, len(assignments)) or 1) as executor:
+            submission_futures = {
+                assignment.get('assignment_id'): executor.submit(
+                    find_student_submission, submissions_table, assignment.get('assignment_id'), student_id
+                )
+                for assignment in assignments
+            }
+        
         enriched_assignments = []
         for assignment in assignments:
             assignment_id = assignment.get('assignment_id')
+            enriched_assignment = build_assignment_entry(assignment, student_class)
             
             # Check if student has submitted this assignment
             try:
-                submission_response = submissions_table.query(
-                    KeyConditionExpression=Key('assignment_id').eq(assignment_id),
-                    FilterExpression=Attr('student_id').eq(student_id)
-                )
-                
-                submissions = submission_response.get('Items', [])
-                
-                if submissions:
-                    # Student has submitted
-                    submission = submissions[0]
-                    status = submission.get('status', 'submitted')
-                    score = submission.get('score')
-                    feedback = submission.get('feedback')
-                    
-                    enriched_assignment = {
-                        'assignmentId': assignment_id,
-                        'title': assignment.get('title', 'Untitled Assignment'),
-                        'subject': assignment.get('subject', 'General'),
-                        'className': assignment.get('class_info', student_class),
-                        'dueDate': assignment.get('due_date', ''),
-                        'instructions': assignment.get('instructions', ''),
-                        'status': status,
-                        'score': score,
-                        'feedback': feedback,
-                        'teacherId': assignment.get('teacher_id', ''),
-                        'createdAt': assignment.get('created_at', '')
-                    }
-                else:
-                    # Student hasn't submitted yet
-                    enriched_assignment = {
-                        'assignmentId': assignment_id,
-                        'title': assignment.get('title', 'Untitled Assignment'),
-                        'subject': assignment.get('subject', 'General'),
-                        'className': assignment.get('class_info', student_class),
-                        'dueDate': assignment.get('due_date', ''),
-                        'instructions': assignment.get('instructions', ''),
-                        'status': 'pending',
-                        'teacherId': assignment.get('teacher_id', ''),
-                        'createdAt': assignment.get('created_at', '')
-                    }
-                
-                enriched_assignments.append(enriched_assignment)
-                
+                submission = submission_futures[assignment_id].result()
             except Exception as e:
+                # Leave the assignment as pending if we can't check submission status
                 print(f"⚠️ Error checking submission for {assignment_id}: {str(e)}")
-                # Add assignment as pending if we can't check submission status
-                enriched_assignments.append({
-                    'assignmentId': assignment_id,
-                    'title': assignment.get('title', 'Untitled Assignment'),
-                    'subject': assignment.get('subject', 'General'),
-                    'className': assignment.get('class_info', student_class),
-                    'dueDate': assignment.get('due_date', ''),
-                    'instructions': assignment.get('instructions', ''),
-                    'status': 'pending',
-                    'teacherId': assignment.get('teacher_id', ''),
-                    'createdAt': assignment.get('created_at', '')
-                })
+                submission = None
+            
+            if submission is not None:
+                # Student has submitted
+                enriched_assignment['status'] = submission.get('status', 'submitted')
+                enriched_assignment['score'] = submission.get('score')
+                enriched_assignment['feedback'] = submission.get('feedback')
+            
+            enriched_assignments.append(enriched_assignment)
         
         # Sort by due date (most recent first)
         enriched_assignments.sort(key=lambda x: x.get('dueDate', ''), reverse=True)
         
-        print(f"✅ Returning {len(enriched_assignments)} enriched assignments")
+        if DEBUG:
+            print(f"✅ Returning {len(enriched_assignments)} enriched assignments")
         
         return {
             'statusCode': 200,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*',
-                'Access-Control-Allow-Headers': 'Content-Type,Authorization',
-                'Access-Control-Allow-Methods': 'GET,OPTIONS'
-            },
+            'headers': CORS_HEADERS,
             'body': json.dumps({
                 'success': True,
                 'assignments': enriched_assignments,
                 'studentClass': student_class
-            }, default=decimal_to_native)
+            }, default=decimal_to_native, separators=(',', ':'))
         }
         
     except Exception as e:
@@ -196,10 +228,7 @@ def lambda_handler(event, context):
         
         return {
             'statusCode': 500,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
+            'headers': JSON_HEADERS,
             'body': json.dumps({
                 'error': 'Internal server error',
                 'message': str(e)
@@ -1,10 +1,20 @@
+import os
 import json
+import time
 import boto3
-from boto3.dynamodb.conditions import Key, Attr
 from decimal import Decimal
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from botocore.config import Config
+
+boto_config = Config(
+    max_pool_connections=50,
+    retries={'max_attempts': 3, 'mode': 'adaptive'},
+    tcp_keepalive=True
+)
 
 # Initialize DynamoDB - matching your actual setup
-dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
+dynamodb = boto3.resource('dynamodb', region_name='us-east-1', config=boto_config)
 
 # Your actual table names (based on GetStudentProfile)
 USERS_TABLE = dynamodb.Table('Users')  # Note: No -dev suffix
@@ -19,12 +29,115 @@ CORS_HEADERS = {
     'Access-Control-Allow-Headers': 'Content-Type, Authorization, X-Requested-With'
 }
 
+# Fixed-shape key/filter expressions built once; only the values change per request
+# ('name' and 'role' are DynamoDB reserved words, hence the #n / #r aliases)
+CLASS_NAME_KEY = '#n = :name'
+CLASS_NAME_FILTER = '#n = :name OR className = :name'
+CLASS_NAME_NAMES = {'#n': 'name'}
+CLASS_ID_EXPRESSION = 'classId = :cid'
+STUDENTS_IN_CLASS_FILTER = '#r = :role AND classId = :cid'
+STUDENTS_IN_CLASS_NAMES = {'#r': 'role'}
+
+# Verbose request tracing (full event dumps, progress prints) only when LOG_LEVEL=DEBUG
+DEBUG = os.environ.get('LOG_LEVEL') == 'DEBUG'
+
+# Parallel get_item fallback when BatchGetItem fails (kept below max_pool_connections)
+USER_LOOKUP_WORKERS = 16
+
+# Lookups cached across warm invocations: ('class', className) -> classId,
+# ('roster', classId) -> (students, source) and ('user', userId) -> Users item
+CLASS_CACHE_TTL = 120
+CLASS_CACHE_MAX = 1024
+_class_cache = OrderedDict()
+
+def cache_get(key):
+    """Return a fresh cached value, or None"""
+    cached = _class_cache.get(key)
+    if cached and time.monotonic() - cached[0] < CLASS_CACHE_TTL:
+        return cached[1]
+    return None
+
+def cache_put(key, value):
+    """Store a value in the warm cache, evicting the oldest entries when full"""
+    _class_cache[key] = (time.monotonic(), value)
+    _class_cache.move_to_end(key)
+    while len(_class_cache) > CLASS_CACHE_MAX:
+        _class_cache.popitem(last=False)
+
 def decimal_default(obj):
     """Helper to convert Decimal to float for JSON serialization"""
     if isinstance(obj, Decimal):
         return int(obj) if obj % 1 == 0 else float(obj)
     raise TypeError
 
+def batch_get_students(student_ids):
+    """Fetch student users (warm cache first, then BatchGetItem), keyed by userId"""
+    users_by_id = {}
+    
+    # BatchGetItem rejects duplicate keys, so dedupe while checking the cache
+    missing_ids = []
+    for student_id in dict.fromkeys(student_ids):
+        cached_user = cache_get(('user', student_id))
+        if cached_user:
+            users_by_id[student_id] = cached_user
+        else:
+            missing_ids.append(student_id)
+    
+    # BatchGetItem accepts at most 100 keys per request
+    for i in range(0, len(missing_ids), 100):
+        request_items = {
+            'Users': {
+                # Composite key: userId (partition) + role (sort)
+                'Keys': [{'userId': student_id, 'role': 'student'} for student_id in missing_ids[i:i + 100]]
+            }
+        }
+        
+        attempt = 0
+        while request_items:
+            try:
+                response = dynamodb.batch_get_item(RequestItems=request_items)
+            except Exception as e:
+                print(f'❌ Error fetching users batch, falling back to get_item: {e}')
+                pending_ids = [key['userId'] for key in request_items['Users']['Keys']]
+                users_by_id.update(get_students_individually(pending_ids))
+                break
+            
+            for user in response.get('Responses', {}).get('Users', []):
+                users_by_id[user.get('userId')] = user
+                cache_put(('user', user.get('userId')), user)
+            
+            request_items = response.get('UnprocessedKeys') or {}
+            if request_items:
+                if attempt >= 5:
+                    print(f"⚠ Giving up on {len(request_items['Users']['Keys'])} unprocessed user keys")
+                    break
+                # Exponential backoff before retrying throttled keys
+                time.sleep(min(0.05 * (2 ** attempt), 1.0))
+                attempt += 1
+    
+    return users_by_id
+
+def get_students_individually(student_ids):
+    """Fetch student users with concurrent get_item calls, keyed by userId"""
+    def get_student(student_id):
+        try:
+            return USERS_TABLE.get_item(
+                Key={
+                    'userId': student_id,
+                    'role': 'student'
+                }
+            ).get('Item')
+        except Exception as e:
+            print(f'❌ Error fetching user {student_id}: {e}')
+            return None
+    
+    with ThreadPoolExecutor(max_workers=min(USER_LOOKUP_WORKERS, len(student_ids)) or 1) as executor:
+        users = [user for user in executor.map(get_student, student_ids) if user]
+    
+    for user in users:
+        cache_put(('user', user.get('userId')), user)
+    return {user.get('userId'): user for user in users}
+
 def lambda_handler(event, context):
     """
     Get all students enrolled in a specific class
@@ -34,12 +147,14 @@ def lambda_handler(event, context):
     - className: Alternative - fetch by class name
     """
     
-    print('GetStudentsByClass Lambda invoked')
-    print('Event:', json.dumps(event, default=str))
+    if DEBUG:
+        print('GetStudentsByClass Lambda invoked')
+        print('Event:', json.dumps(event, default=str))
     
     # ===== HANDLE OPTIONS PREFLIGHT REQUEST =====
     if event.get('httpMethod') == 'OPTIONS':
-        print('Handling OPTIONS preflight request')
+        if DEBUG:
+            print('Handling OPTIONS preflight request')
         return {
             'statusCode': 200,
             'headers': CORS_HEADERS,
@@ -52,7 +167,8 @@ def lambda_handler(event, context):
         class_id = query_params.get('classId')
         class_name = query_params.get('className')
         
-        print(f'Query params - classId: {class_id}, className: {class_name}')
+        if DEBUG:
+            print(f'Query params - classId: {class_id}, className: {class_name}')
         
         # Validate input
         if not class_id and not class_name:
@@ -69,13 +185,33 @@ def lambda_handler(event, context):
         
         # If className provided, lookup the classId first
         if class_name and not class_id:
-            print(f'Looking up class by name: {class_name}')
+            class_id = cache_get(('class', class_name))
+        
+        if class_name and not class_id:
+            if DEBUG:
+                print(f'Looking up class by name: {class_name}')
             
             try:
-                # Scan to find class by name
-                response = CLASSES_TABLE.scan(
-                    FilterExpression=Attr('name').eq(class_name) | Attr('className').eq(class_name)
-                )
+                # Look the class up by name on the name-index GSI
+                try:
+                    response = CLASSES_TABLE.query(
+                        IndexName='name-index',
+                        KeyConditionExpression=CLASS_NAME_KEY,
+                        ExpressionAttributeNames=CLASS_NAME_NAMES,
+                        ExpressionAttributeValues={':name': class_name},
+                        Limit=1
+                    )
+                except Exception as e:
+                    print(f'GSI query failed, trying scan: {e}')
+                    response = {'Items': []}
+                
+                # Older classes may only carry className, so fall back to a scan on a miss
+                if not response['Items']:
+                    response = CLASSES_TABLE.scan(
+                        FilterExpression=CLASS_NAME_FILTER,
+                        ExpressionAttributeNames=CLASS_NAME_NAMES,
+                        ExpressionAttributeValues={':name': class_name}
+                    )
                 
                 if not response['Items']:
                     print(f'Class not found: {class_name}')
@@ -91,13 +227,30 @@ def lambda_handler(event, context):
                     }
                 
                 class_id = response['Items'][0].get('classId') or response['Items'][0].get('id')
-                print(f'Found class ID: {class_id}')
+                if DEBUG:
+                    print(f'Found class ID: {class_id}')
+                cache_put(('class', class_name), class_id)
             except Exception as e:
                 print(f'Error looking up class: {e}')
                 # If Classes table doesn't exist, use className as classId
                 class_id = class_name
         
-        print(f'Fetching students for classId: {class_id}')
+        if DEBUG:
+            print(f'Fetching students for classId: {class_id}')
+        
+        cached_roster = cache_get(('roster', class_id))
+        if cached_roster:
+            students, source = cached_roster
+            return {
+                'statusCode': 200,
+                'headers': CORS_HEADERS,
+                'body': json.dumps({
+                    'success': True,
+                    'students': students,
+                    'count': len(students),
+                    'source': source
+                }, default=decimal_default, separators=(',', ':'))
+            }
         
         # OPTION 1: If you have an Enrollments table
         try:
@@ -105,19 +258,24 @@ def lambda_handler(event, context):
             try:
                 enrollments_response = ENROLLMENTS_TABLE.query(
                     IndexName='ClassId-index',
-                    KeyConditionExpression=Key('classId').eq(class_id)
+                    KeyConditionExpression=CLASS_ID_EXPRESSION,
+                    ExpressionAttributeValues={':cid': class_id}
                 )
-                print('✅ Used Enrollments table with GSI')
+                if DEBUG:
+                    print('✅ Used Enrollments table with GSI')
             except Exception as e:
                 print(f'GSI query failed, trying scan: {e}')
                 enrollments_response = ENROLLMENTS_TABLE.scan(
-                    FilterExpression=Attr('classId').eq(class_id)
+                    FilterExpression=CLASS_ID_EXPRESSION,
+                    ExpressionAttributeValues={':cid': class_id}
                 )
-                print('✅ Used Enrollments table with scan')
+                if DEBUG:
+                    print('✅ Used Enrollments table with scan')
             
             enrollments = enrollments_response.get('Items', [])
             student_ids = [e.get('studentId') or e.get('userId') for e in enrollments if e.get('studentId') or e.get('userId')]
-            print(f'Found {len(student_ids)} students in Enrollments table')
+            if DEBUG:
+                print(f'Found {len(student_ids)} students in Enrollments table')
             
         except Exception as enrollment_error:
             print(f'⚠ Enrollments table not accessible: {enrollment_error}')
@@ -127,11 +285,14 @@ def lambda_handler(event, context):
             try:
                 # Scan Users table for students with this classId
                 users_response = USERS_TABLE.scan(
-                    FilterExpression=Attr('role').eq('student') & Attr('classId').eq(class_id)
+                    FilterExpression=STUDENTS_IN_CLASS_FILTER,
+                    ExpressionAttributeNames=STUDENTS_IN_CLASS_NAMES,
+                    ExpressionAttributeValues={':role': 'student', ':cid': class_id}
                 )
                 
                 students_from_users = users_response.get('Items', [])
-                print(f'Found {len(students_from_users)} students directly in Users table')
+                if DEBUG:
+                    print(f'Found {len(students_from_users)} students directly in Users table')
                 
                 # Extract valid students with emails
                 valid_students = []
@@ -145,7 +306,9 @@ def lambda_handler(event, context):
                             'classId': user.get('classId')
                         })
                 
-                print(f'✅ Found {len(valid_students)} students with valid emails')
+                if DEBUG:
+                    print(f'✅ Found {len(valid_students)} students with valid emails')
+                cache_put(('roster', class_id), (valid_students, 'users_table_direct'))
                 
                 return {
                     'statusCode': 200,
@@ -155,7 +318,7 @@ def lambda_handler(event, context):
                         'students': valid_students,
                         'count': len(valid_students),
                         'source': 'users_table_direct'
-                    }, default=decimal_default)
+                    }, default=decimal_default, separators=(',', ':'))
                 }
                 
             except Exception as users_error:
@@ -175,42 +338,35 @@ def lambda_handler(event, context):
                 })
             }
         
-        print(f'Fetching details for student IDs: {student_ids}')
+        if DEBUG:
+            print(f'Fetching details for student IDs: {student_ids}')
         
-        # Fetch student details from Users table
+        # Fetch student details from Users table in batches
         # CRITICAL: Your Users table has composite key (userId + role)
+        users_by_id = batch_get_students(student_ids)
+        
         students = []
         for student_id in student_ids:
-            try:
-                # Get user with composite key: userId (partition) + role (sort)
-                response = USERS_TABLE.get_item(
-                    Key={
-                        'userId': student_id,
-                        'role': 'student'
-                    }
-                )
+            user = users_by_id.get(student_id)
+            if user:
+                user_email = user.get('email')
                 
-                if 'Item' in response:
-                    user = response['Item']
-                    user_email = user.get('email')
-                    
-                    # Only include if has valid email
-                    if user_email and '@' in user_email:
-                        students.append({
-                            'id': user.get('userId'),
-                            'name': user.get('name', 'Unknown'),
-                            'email': user_email,
-                            'classId': class_id
-                        })
+                # Only include if has valid email
+                if user_email and '@' in user_email:
+                    students.append({
+                        'id': user.get('userId'),
+                        'name': user.get('name', 'Unknown'),
+                        'email': user_email,
+                        'classId': class_id
+                    })
+                    if DEBUG:
                         print(f'✅ Added student: {user.get("name")} ({user_email})')
-                else:
-                    print(f'⚠ Student {student_id} not found in Users table')
-                    
-            except Exception as e:
-                print(f'❌ Error fetching user {student_id}: {e}')
-                continue
+            else:
+                print(f'⚠ Student {student_id} not found in Users table')
         
-        print(f'✅ Successfully fetched {len(students)} students with valid emails')
+        if DEBUG:
+            print(f'✅ Successfully fetched {len(students)} students with valid emails')
+        cache_put(('roster', class_id), (students, 'enrollments_table'))
         
         return {
             'statusCode': 200,
@@ -220,7 +376,7 @@ def lambda_handler(event, context):
                 'students': students,
                 'count': len(students),
                 'source': 'enrollments_table'
-            }, default=decimal_default)
+            }, default=decimal_default, separators=(',', ':'))
         }
         
     except Exception as e:
@@ -1,18 +1,86 @@
 import json
+import time
+import heapq
 import boto3
-from boto3.dynamodb.conditions import Key
+from boto3.dynamodb.conditions import Key, Attr
 from decimal import Decimal
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from botocore.config import Config
 
-dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
+boto_config = Config(
+    max_pool_connections=50,
+    retries={'max_attempts': 3, 'mode': 'adaptive'},
+    tcp_keepalive=True
+)
+
+dynamodb = boto3.resource('dynamodb', region_name='us-east-1', config=boto_config)
 users_table = dynamodb.Table('Users')
 content_table = dynamodb.Table('sahayak-content')
 assignments_table = dynamodb.Table('Assignments-dev')
 
+# Serialized profile bodies cached across warm invocations for dashboard polling: user_id -> (built_at, body)
+PROFILE_CACHE_TTL = 30
+PROFILE_CACHE_MAX = 1024
+_profile_cache = OrderedDict()
+
+# Response headers shared by every return path
+JSON_HEADERS = {
+    'Content-Type': 'application/json',
+    'Access-Control-Allow-Origin': '*'
+}
+
 def decimal_default(obj):
     if isinstance(obj, Decimal):
         return int(obj) if obj % 1 == 0 else float(obj)
     raise TypeError
 
+def fetch_master_content(user_id):
+    """Get the teacher's MASTER content entries (not individual parts) using the teacherId-index GSI"""
+    try:
+        query_kwargs = {
+            'IndexName': 'teacherId-index',
+            'KeyConditionExpression': Key('teacherId').eq(user_id),
+            # Part rows are dropped server-side so only MASTER entries cross the wire
+            'FilterExpression': Attr('partNumber').eq('MASTER'),
+            'ProjectionExpression': 'contentId, subject, classId, #s, createdAt, totalParts',
+            'ExpressionAttributeNames': {'#s': 'status'}
+        }
+        master_content = []
+        while True:
+            content_response = content_table.query(**query_kwargs)
+            master_content.extend(content_response.get('Items', []))
+            
+            last_key = content_response.get('LastEvaluatedKey')
+            if not last_key:
+                return master_content
+            query_kwargs['ExclusiveStartKey'] = last_key
+    except Exception as e:
+        print(f"Content query error: {e}")
+        return []
+
+def fetch_assignments(user_id):
+    """Get the teacher's assignments using the TeacherAssignments GSI"""
+    try:
+        query_kwargs = {
+            'IndexName': 'TeacherAssignments',
+            'KeyConditionExpression': Key('teacher_id').eq(user_id),
+            'ProjectionExpression': 'assignment_id, title, subject, #s, created_at, due_date',
+            'ExpressionAttributeNames': {'#s': 'status'}
+        }
+        assignments = []
+        while True:
+            assignments_response = assignments_table.query(**query_kwargs)
+            assignments.extend(assignments_response.get('Items', []))
+            
+            last_key = assignments_response.get('LastEvaluatedKey')
+            if not last_key:
+                return assignments
+            query_kwargs['ExclusiveStartKey'] = last_key
+    except Exception as e:
+        print(f"Assignments query error: {e}")
+        return []
+
 def lambda_handler(event, context):
     try:
         # Get userId from query string
@@ -23,31 +91,41 @@ def lambda_handler(event, context):
         if not user_id:
             return {
                 'statusCode': 400,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*'
-                },
+                'headers': JSON_HEADERS,
                 'body': json.dumps({
                     'success': False,
                     'error': 'userId is required'
                 })
             }
         
-        # Get user with both partition and sort key
-        user_response = users_table.get_item(
-            Key={
-                'userId': user_id,
-                'role': 'teacher'
+        cached = _profile_cache.get(user_id)
+        if cached and time.monotonic() - cached[0] < PROFILE_CACHE_TTL:
+            return {
+                'statusCode': 200,
+                'headers': JSON_HEADERS,
+                'body': cached[1]
             }
-        )
+        
+        # Content and assignments don't depend on the user lookup, so fetch all three at once
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            content_future = executor.submit(fetch_master_content, user_id)
+            assignments_future = executor.submit(fetch_assignments, user_id)
+            
+            # Get user with both partition and sort key
+            user_response = users_table.get_item(
+                Key={
+                    'userId': user_id,
+                    'role': 'teacher'
+                }
+            )
+            
+            master_content = content_future.result()
+            assignments = assignments_future.result()
         
         if 'Item' not in user_response:
             return {
                 'statusCode': 404,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*'
-                },
+                'headers': JSON_HEADERS,
                 'body': json.dumps({
                     'success': False,
                     'error': 'Teacher not found'
@@ -56,47 +134,26 @@ def lambda_handler(event, context):
         
         user = user_response['Item']
         
-        # Get content statistics using teacherId-index GSI
-        try:
-            content_response = content_table.query(
-                IndexName='teacherId-index',
-                KeyConditionExpression=Key('teacherId').eq(user_id)
-            )
-            content_items = content_response.get('Items', [])
-        except Exception as e:
-            print(f"Content query error: {e}")
-            content_items = []
-        
         # Count only MASTER entries (not individual parts)
-        master_content = [c for c in content_items if c.get('partNumber') == 'MASTER']
         total_content = len(master_content)
         
-        # Count by status
-        scheduled_content = len([c for c in master_content if c.get('status') == 'scheduled'])
-        delivered_content = len([c for c in master_content if c.get('status') == 'delivered'])
+        # Count by status in a single pass
+        scheduled_content = delivered_content = 0
+        for c in master_content:
+            status = c.get('status')
+            if status == 'scheduled':
+                scheduled_content += 1
+            elif status == 'delivered':
+                delivered_content += 1
         
         # Get assignment statistics
-        try:
-            assignments_response = assignments_table.scan(
-                FilterExpression='teacher_id = :tid',
-                ExpressionAttributeValues={
-                    ':tid': user_id
-                }
-            )
-            assignments = assignments_response.get('Items', [])
-        except Exception as e:
-            print(f"Assignments query error: {e}")
-            assignments = []
-        
         total_assignments = len(assignments)
         
-        # Get recent content (last 5)
-        sorted_content = sorted(master_content, key=lambda x: x.get('createdAt', ''), reverse=True)
-        recent_content = sorted_content[:5]
+        # Get recent content (last 5) without sorting everything
+        recent_content = heapq.nlargest(5, master_content, key=lambda x: x.get('createdAt', ''))
         
         # Get recent assignments (last 5)
-        sorted_assignments = sorted(assignments, key=lambda x: x.get('created_at', ''), reverse=True)
-        recent_assignments = sorted_assignments[:5]
+        recent_assignments = heapq.nlargest(5, assignments, key=lambda x: x.get('created_at', ''))
         
         # Build response
         profile_data = {
@@ -150,26 +207,27 @@ def lambda_handler(event, context):
             ]
         }
         
+        body = json.dumps({
+            'success': True,
+            'data': profile_data
+        }, default=decimal_default, separators=(',', ':'))
+        
+        _profile_cache[user_id] = (time.monotonic(), body)
+        _profile_cache.move_to_end(user_id)
+        while len(_profile_cache) > PROFILE_CACHE_MAX:
+            _profile_cache.popitem(last=False)
+        
         return {
             'statusCode': 200,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps({
-                'success': True,
-                'data': profile_data
-            }, default=decimal_default)
+            'headers': JSON_HEADERS,
+            'body': body
         }
         
     except Exception as e:
         print(f"Error: {str(e)}")
         return {
             'statusCode': 500,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
+            'headers': JSON_HEADERS,
             'body': json.dumps({
                 'success': False,
                 'error': str(e)
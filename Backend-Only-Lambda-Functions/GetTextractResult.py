@@ -1,14 +1,68 @@
+import io
+import os
 import json
+import math
+import hashlib
 import boto3
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from botocore.config import Config
 
 # Initialize AWS clients
 textract = boto3.client('textract', region_name='us-east-1')
+# Separate client (own connection pool) for hedged status checks on straggling jobs
+textract_hedge = boto3.client('textract', region_name='us-east-1', config=Config(retries={'max_attempts': 1}))
 dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
+s3 = boto3.client('s3', region_name='us-east-1')
 
 TABLE_NAME = 'ContentTable'
+EXTRACT_BUCKET = 'sahayak-enhancer-input-01'
 table = dynamodb.Table(TABLE_NAME)
 
+# Expected job time r = l + b / t: fixed latency l (seconds) plus document bytes b over throughput t
+TEXTRACT_BASE_LATENCY = float(os.environ.get('TEXTRACT_BASE_LATENCY', '10'))
+TEXTRACT_BYTES_PER_SECOND = float(os.environ.get('TEXTRACT_BYTES_PER_SECOND', '100000'))
+# A job still running past this multiple of its expected time is treated as a straggler
+STRAGGLER_FACTOR = 2
+MAX_POLL_WAIT = 5
+
+def expected_job_seconds(document_bytes):
+    """Model how long a Textract job on a document of this size should take"""
+    return TEXTRACT_BASE_LATENCY + (document_bytes or 0) / TEXTRACT_BYTES_PER_SECOND
+
+def get_job_response(job_id, hedge):
+    """Fetch the job's first result page; when hedging, race two clients and keep the first answer"""
+    if not hedge:
+        return textract.get_document_text_detection(JobId=job_id)
+    
+    # A fresh pool per call, so a straggler left over from an earlier poll can't queue this pair
+    executor = ThreadPoolExecutor(max_workers=2)
+    futures = [
+        executor.submit(client.get_document_text_detection, JobId=job_id)
+        for client in (textract, textract_hedge)
+    ]
+    # The slower request is left to finish in the background
+    executor.shutdown(wait=False)
+    error = None
+    for future in as_completed(futures):
+        try:
+            return future.result()
+        except Exception as e:
+            error = e
+    raise error
+
+def write_lines(blocks, text_buffer, line_count):
+    """Append each LINE block's text to the buffer, newline-separated; returns the new line count"""
+    write = text_buffer.write
+    for block in blocks:
+        if block['BlockType'] == 'LINE':
+            # Separator goes before each line so the result matches '\n'.join without a copy
+            if line_count:
+                write('\n')
+            write(block['Text'])
+            line_count += 1
+    return line_count
+
 def lambda_handler(event, context):
     """
     Check Textract job status and retrieve extracted text
@@ -26,82 +80,85 @@ def lambda_handler(event, context):
         
         print(f"Checking Textract job {job_id} for content {content_id}")
         
+        # Jobs running well past their expected time get a hedged status check
+        started_at = event.get('textractStartedAt')
+        elapsed = time.time() - started_at if started_at else 0
+        expected = expected_job_seconds(event.get('documentBytes'))
+        straggling = elapsed > STRAGGLER_FACTOR * expected
+        
         # Check job status
-        response = textract.get_document_text_detection(JobId=job_id)
+        response = get_job_response(job_id, hedge=straggling)
         
         status = response['JobStatus']
-        print(f"Textract status: {status}")
+        print(f"Textract status: {status} after {elapsed:.1f}s (expected {expected:.1f}s)")
         
         if status == 'IN_PROGRESS':
-            # Return status to trigger retry in Step Functions
-            return {
-                'contentId': content_id,
-                'textractJobId': job_id,
-                'status': 'IN_PROGRESS',
-                'waitTime': 5,  # Wait 5 seconds before retry
-                **{k: v for k, v in event.items() if k not in ['contentId', 'textractJobId']}
-            }
+            # Poll again when the job should be done, but never wait longer than before
+            remaining = expected - elapsed
+            wait_time = min(MAX_POLL_WAIT, max(1, math.ceil(remaining))) if remaining > 0 else MAX_POLL_WAIT
+            
+            # Return status to trigger retry in Step Functions (one copy of the incoming state)
+            result = dict(event)
+            result['status'] = 'IN_PROGRESS'
+            result['waitTime'] = wait_time
+            return result
         
         elif status == 'SUCCEEDED':
-            # Extract all text blocks
-            extracted_text = []
+            # Stream LINE blocks (preserving document structure) straight into one buffer
+            text_buffer = io.StringIO()
+            line_count = write_lines(response.get('Blocks', []), text_buffer, 0)
             
-            # Get all pages (handle pagination)
-            next_token = None
-            while True:
-                if next_token:
-                    response = textract.get_document_text_detection(
-                        JobId=job_id,
-                        NextToken=next_token
-                    )
-                
-                # Extract LINE blocks (preserve document structure)
-                for block in response.get('Blocks', []):
-                    if block['BlockType'] == 'LINE':
-                        extracted_text.append(block['Text'])
-                
+            # The status check already fetched the first page; follow NextToken for the rest
+            # (botocore has no paginator for get_document_text_detection)
+            next_token = response.get('NextToken')
+            while next_token:
+                response = textract.get_document_text_detection(
+                    JobId=job_id,
+                    NextToken=next_token
+                )
+                line_count = write_lines(response.get('Blocks', []), text_buffer, line_count)
                 next_token = response.get('NextToken')
-                if not next_token:
-                    break
             
-            full_text = '\n'.join(extracted_text)
+            full_text = text_buffer.getvalue()
             
-            print(f"Extracted {len(extracted_text)} lines, {len(full_text)} characters")
+            print(f"Extracted {line_count} lines, {len(full_text)} characters")
+            
+            # Keep the full text in S3; DynamoDB items (400 KB) and Step Functions state (256 KB) only get a pointer
+            text_bytes = full_text.encode('utf-8')
+            extracted_location = {
+                'bucket': event.get('inputBucket', EXTRACT_BUCKET),
+                'key': f"extracted/{content_id}.txt",
+                'sha256': hashlib.sha256(text_bytes).hexdigest(),
+                'length': len(full_text)
+            }
+            s3.put_object(
+                Bucket=extracted_location['bucket'],
+                Key=extracted_location['key'],
+                Body=text_bytes,
+                ContentType='text/plain; charset=utf-8'
+            )
             
-            # Update progress
             table.update_item(
                 Key={'contentId': content_id},
-                UpdateExpression='SET progress = :p, extractedText = :text, currentStep = :step',
+                UpdateExpression='SET extractedTextS3 = :location, extractedTextLength = :length',
                 ExpressionAttributeValues={
-                    ':p': 30,
-                    ':text': full_text[:5000],  # Store first 5000 chars in DynamoDB
-                    ':step': 'Text extraction completed'
+                    ':location': {'bucket': extracted_location['bucket'], 'key': extracted_location['key']},
+                    ':length': len(full_text)
                 }
             )
             
-            # Return extracted text for next step
-            return {
-                'contentId': content_id,
-                'extractedText': full_text,
-                'status': 'SUCCEEDED',
-                **{k: v for k, v in event.items() if k not in ['contentId', 'textractJobId', 'status']}
-            }
+            # Return a pointer to the extracted text for next step
+            result = dict(event)
+            del result['textractJobId']
+            result['extractedTextS3'] = extracted_location
+            result['status'] = 'SUCCEEDED'
+            return result
         
         else:  # FAILED or PARTIAL_SUCCESS
             error_msg = f"Textract job failed with status: {status}"
             print(error_msg)
             
-            # Update DynamoDB
-            table.update_item(
-                Key={'contentId': content_id},
-                UpdateExpression='SET #status = :status, errorMessage = :error',
-                ExpressionAttributeNames={'#status': 'status'},
-                ExpressionAttributeValues={
-                    ':status': 'FAILED',
-                    ':error': error_msg
-                }
-            )
-            
+            # The handler below records FAILED and the message in a single update
             raise Exception(error_msg)
         
     except Exception as e:
@@ -1,5 +1,30 @@
 import json
+import os
+import uuid
 import boto3
+from botocore.config import Config
+
+boto_config = Config(
+    max_pool_connections=50,
+    retries={'max_attempts': 3, 'mode': 'adaptive'},
+    tcp_keepalive=True
+)
+
+# When set, submissions are buffered on SQS (ProcessSubmission consumes in batches)
+# instead of invoking ProcessSubmission directly
+SUBMISSION_QUEUE_URL = os.environ.get('SUBMISSION_QUEUE_URL')
+sqs = boto3.client('sqs', config=boto_config) if SUBMISSION_QUEUE_URL else None
+lambda_client = boto3.client('lambda', config=boto_config)
+
+# Open the Lambda endpoint connection during INIT so the first request skips the TLS handshake
+if not sqs:
+    try:
+        lambda_client.get_account_settings()
+    except Exception as e:
+        print(f"Lambda client warm-up skipped: {str(e)}")
+
+# Full payload dumps are only worth their serialization cost when debugging
+DEBUG = os.environ.get('LOG_LEVEL') == 'DEBUG'
 
 def lambda_handler(event, context):
     print("Processing Google Forms webhook")
@@ -11,7 +36,8 @@ def lambda_handler(event, context):
         else:
             body = event
         
-        print(f"Received webhook payload: {json.dumps(body, indent=2)}")
+        if DEBUG:
+            print(f"Received webhook payload: {json.dumps(body, indent=2)}")
         
         # Extract form response data and map to our submission format
         submission_data = map_google_forms_response(body)
@@ -26,39 +52,45 @@ def lambda_handler(event, context):
         if not submission_data.get('answers'):
             raise ValueError("No answers found in form response")
         
-        print(f"Mapped submission data: {json.dumps(submission_data, indent=2)}")
+        if DEBUG:
+            print(f"Mapped submission data: {json.dumps(submission_data, indent=2)}")
         
-        # Call ProcessSubmission Lambda
-        lambda_client = boto3.client('lambda')
-        response = lambda_client.invoke(
-            FunctionName='ProcessSubmission-dev',
-            InvocationType='RequestResponse',
-            Payload=json.dumps(submission_data)
-        )
+        # Pre-assign the submission ID so the caller can track it without waiting
+        submission_data['submission_id'] = str(uuid.uuid4())
         
-        # Parse the response from ProcessSubmission
-        response_payload = json.loads(response['Payload'].read())
+        payload = json.dumps(submission_data, separators=(',', ':'))
         
-        if response_payload['statusCode'] == 200:
-            result_body = json.loads(response_payload['body'])
-            return {
-                'statusCode': 200,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps({
-                    'status': 'success',
-                    'submission_id': result_body.get('submission_id'),
-                    'assignment_id': result_body.get('assignment_id'),
-                    'student_id': result_body.get('student_id'),
-                    'message': 'Google Forms submission processed successfully'
-                })
-            }
+        if sqs:
+            # Buffer on the queue so deadline bursts are absorbed and processed in batches
+            sqs.send_message(
+                QueueUrl=SUBMISSION_QUEUE_URL,
+                MessageBody=payload,
+                MessageAttributes={
+                    'assignment_id': {'DataType': 'String', 'StringValue': submission_data['assignment_id']}
+                }
+            )
         else:
-            # Forward the error from ProcessSubmission
-            error_body = json.loads(response_payload['body'])
-            raise Exception(f"ProcessSubmission failed: {error_body.get('message', 'Unknown error')}")
+            # Hand off to ProcessSubmission asynchronously; Lambda queues the event and retries on failure
+            lambda_client.invoke(
+                FunctionName='ProcessSubmission-dev',
+                InvocationType='Event',
+                Payload=payload
+            )
+        
+        return {
+            'statusCode': 202,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': json.dumps({
+                'status': 'accepted',
+                'submission_id': submission_data['submission_id'],
+                'assignment_id': submission_data['assignment_id'],
+                'student_id': submission_data['student_id'],
+                'message': 'Google Forms submission accepted for processing'
+            })
+        }
         
     except Exception as e:
         print(f"Error processing Google Forms webhook: {str(e)}")
@@ -1,46 +1,530 @@
 import json
+import time
+import random
 import boto3
 import smtplib
 import os
+import threading
+import string
+import re
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from boto3.dynamodb.conditions import Key
+from botocore.config import Config
+from botocore.exceptions import ClientError
 from decimal import Decimal
-from datetime import datetime
+from datetime import datetime, timedelta
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
-dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
+# Adaptive retries back off (with jitter) when a class-wide blast hits DynamoDB throttling
+boto_config = Config(
+    max_pool_connections=50,
+    retries={'max_attempts': 5, 'mode': 'adaptive'},
+    tcp_keepalive=True
+)
+
+dynamodb = boto3.resource('dynamodb', region_name='us-east-1', config=boto_config)
 users_table = dynamodb.Table('Users')
 assignments_table = dynamodb.Table('Assignments-dev')
 submissions_table = dynamodb.Table('Submissions-dev')
 
+# When set, parent emails go out through SES SendBulkEmail (50 recipients per call) instead of Gmail SMTP
+SES_FROM_EMAIL = os.environ.get('SES_FROM_EMAIL')
+ses = boto3.client('sesv2', region_name='us-east-1', config=boto_config) if SES_FROM_EMAIL else None
+SES_TEMPLATE_NAME = 'ParentAssignmentResults-v1'
+SES_BULK_MAX = 50
+_ses_template_ready = False
+
+# Parent emails sent in parallel; kept within Gmail's concurrent SMTP connection limit
+NOTIFY_WORKERS = 10
+
+# A 'sending' claim older than Lambda's maximum runtime belongs to a run that died, so it can be taken over
+CLAIM_TIMEOUT_SECONDS = 900
+
+# Transient SMTP failures (4xx replies, dropped connections) are retried with jittered backoff
+SMTP_SEND_ATTEMPTS = 4
+SMTP_RETRY_BASE_DELAY = 1.0
+
+# Warm-container cache of assignment and teacher items, keyed by ('assignment', id) / ('teacher', id)
+ITEM_CACHE_TTL = 300
+ITEM_CACHE_MAX = 256
+_item_cache = OrderedDict()
+_item_cache_lock = threading.Lock()
+
+# Only the attributes the notify loop reads; submissions can carry large answer/feedback blobs
+SUBMISSION_PROJECTION = 'submission_id, student_id, evaluation_status, final_score, max_score'
+STUDENT_PROJECTION = 'userId, #n, parentEmail'
+STUDENT_PROJECTION_NAMES = {'#n': 'name'}
+
+# Parent email body, parsed once at import; filled per assignment, then per student
+PARENT_EMAIL_TEMPLATE = string.Template("""
+        <html>
+        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+            <h2>Dear Parent/Guardian of ${student_name},</h2>
+            
+            <p>Your child has completed the assignment "<strong>${title}</strong>" 
+            for ${subject_line}.</p>
+            
+            <div style="background-color: #f4f4f4; padding: 15px; border-radius: 5px; margin: 20px 0;">
+                <h3 style="margin-top: 0;">Student Performance:</h3>
+                <p><strong>Score:</strong> ${student_score}/${max_score} (${percentage}%)</p>
+                <p><strong>Class Average:</strong> ${class_average}%</p>
+                <p style="color: ${performance_color};">
+                    ${performance_text}
+                </p>
+            </div>
+            
+            <h3>Assignment Details:</h3>
+            <ul>
+                <li><strong>Subject:</strong> ${subject}</li>
+                <li><strong>Class:</strong> ${class_info}</li>
+                <li><strong>Due Date:</strong> ${due_date}</li>
+                <li><strong>Teacher:</strong> ${teacher_name}</li>
+            </ul>
+            
+            <p>If you have questions, please contact the school.</p>
+            
+            <p style="margin-top: 30px;">
+                Best regards,<br>
+                <strong>${teacher_name}</strong><br>
+                Sahayak AI Learning Platform
+            </p>
+        </body>
+        </html>
+        """)
+
+def cache_get(key):
+    """Return a fresh cached value, or None"""
+    cached = _item_cache.get(key)
+    if cached and time.monotonic() - cached[0] < ITEM_CACHE_TTL:
+        return cached[1]
+    return None
+
+def cache_put(key, value):
+    """Store a value in the warm cache, evicting the oldest entries when full"""
+    # Assignment and teacher lookups run on different threads
+    with _item_cache_lock:
+        _item_cache[key] = (time.monotonic(), value)
+        _item_cache.move_to_end(key)
+        while len(_item_cache) > ITEM_CACHE_MAX:
+            _item_cache.popitem(last=False)
+
+def get_assignment(assignment_id):
+    """Fetch an assignment, served from the warm cache when fresh"""
+    assignment = cache_get(('assignment', assignment_id))
+    if assignment is None:
+        assignment = assignments_table.get_item(Key={'assignment_id': assignment_id}).get('Item')
+        if assignment:
+            cache_put(('assignment', assignment_id), assignment)
+    return assignment
+
+def get_teacher_name(teacher_id):
+    """Fetch a teacher's display name, served from the warm cache when fresh"""
+    teacher_name = cache_get(('teacher', teacher_id))
+    if teacher_name is None:
+        teacher_response = users_table.get_item(
+            Key={'userId': teacher_id, 'role': 'teacher'}
+        )
+        teacher = teacher_response.get('Item', {})
+        teacher_name = teacher.get('name', 'Teacher')
+        cache_put(('teacher', teacher_id), teacher_name)
+    return teacher_name
+
+def escape_template_value(value):
+    """Escape a value so it survives a later Template.substitute pass untouched"""
+    return str(value).replace('$', '$$')
+
+def assignment_email_fields(assignment, class_id, teacher_name):
+    """Template fields shared by every parent email for this assignment"""
+    return {
+        'title': assignment.get('title', 'Assignment'),
+        'subject_line': assignment.get('subject', 'the subject'),
+        'subject': assignment.get('subject', 'N/A'),
+        'class_info': assignment.get('class_info', class_id or 'N/A'),
+        'due_date': assignment.get('due_date', 'N/A'),
+        'teacher_name': teacher_name
+    }
+
+def build_email_template(assignment_fields):
+    """Fill in the assignment-wide fields once; only per-student fields remain"""
+    return string.Template(PARENT_EMAIL_TEMPLATE.safe_substitute(
+        {name: escape_template_value(value) for name, value in assignment_fields.items()}
+    ))
+
+def ensure_ses_template():
+    """Register the SES version of the parent email template once per container"""
+    global _ses_template_ready
+    if _ses_template_ready:
+        return
+    
+    # Same HTML with ${field} rewritten as {{{field}}} (triple braces: no HTML escaping, as with SMTP)
+    html = re.sub(r'\$\{(\w+)\}', r'{{{\1}}}', PARENT_EMAIL_TEMPLATE.template)
+    try:
+        ses.create_email_template(
+            TemplateName=SES_TEMPLATE_NAME,
+            TemplateContent={
+                'Subject': 'Assignment Results - {{{title}}}',
+                'Html': html
+            }
+        )
+    except ses.exceptions.AlreadyExistsException:
+        pass
+    _ses_template_ready = True
+
 def decimal_default(obj):
     if isinstance(obj, Decimal):
         return int(obj) if obj % 1 == 0 else float(obj)
     raise TypeError
 
-def send_email(to_email, subject, html_body):
-    """Send email via Gmail SMTP"""
+class SMTPSender:
+    """Gmail SMTP sender that logs in once per worker thread and reuses the connection"""
+    
+    def __init__(self):
+        self.gmail_user = os.environ['GMAIL_USER']
+        self.gmail_password = os.environ['GMAIL_APP_PASSWORD']
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for server in connections:
+            try:
+                server.quit()
+            except Exception:
+                pass
+        return False
+    
+    def _connect(self):
+        """Open and authenticate a connection for the current thread"""
+        server = smtplib.SMTP_SSL('smtp.gmail.com', 465)
+        server.login(self.gmail_user, self.gmail_password)
+        self._local.server = server
+        with self._lock:
+            self._connections.append(server)
+        return server
+    
+    def _connection(self):
+        """Return this thread's live connection, reconnecting if Gmail dropped it"""
+        server = getattr(self._local, 'server', None)
+        if server is None:
+            return self._connect()
+        try:
+            server.noop()
+            return server
+        except smtplib.SMTPServerDisconnected:
+            return self._connect()
+    
+    def send(self, to_email, subject, html_body):
+        """Send one HTML email; returns (success, error)"""
+        try:
+            msg = MIMEMultipart('alternative')
+            msg['Subject'] = subject
+            msg['From'] = self.gmail_user
+            msg['To'] = to_email
+            
+            html_part = MIMEText(html_body, 'html')
+            msg.attach(html_part)
+            
+            message = msg.as_string()
+            delay = SMTP_RETRY_BASE_DELAY
+            for attempt in range(SMTP_SEND_ATTEMPTS):
+                try:
+                    self._connection().sendmail(self.gmail_user, to_email, message)
+                    return True, None
+                except (smtplib.SMTPServerDisconnected, smtplib.SMTPResponseException) as e:
+                    # 5xx replies are permanent (bad address, auth); only 4xx and disconnects are worth retrying
+                    permanent = isinstance(e, smtplib.SMTPResponseException) and not 400 <= e.smtp_code < 500
+                    if permanent or attempt == SMTP_SEND_ATTEMPTS - 1:
+                        raise
+                    if isinstance(e, smtplib.SMTPServerDisconnected):
+                        self._local.server = None
+                    time.sleep(delay + random.uniform(0, delay))
+                    delay *= 2
+        except Exception as e:
+            return False, str(e)
+
+def query_assignment_submissions(assignment_id):
+    """Query every submission for an assignment, following LastEvaluatedKey"""
+    query_kwargs = {
+        'IndexName': 'AssignmentStudentIndex',
+        'KeyConditionExpression': Key('assignment_id').eq(assignment_id),
+        'ProjectionExpression': SUBMISSION_PROJECTION
+    }
+    
+    submissions = []
+    while True:
+        response = submissions_table.query(**query_kwargs)
+        submissions.extend(response.get('Items', []))
+        
+        last_key = response.get('LastEvaluatedKey')
+        if not last_key:
+            break
+        query_kwargs['ExclusiveStartKey'] = last_key
+    
+    return submissions
+
+def batch_get_students(student_ids):
+    """Fetch student users with BatchGetItem, keyed by userId"""
+    students_by_id = {}
+    
+    # BatchGetItem rejects duplicate keys and accepts at most 100 per request
+    unique_ids = list(dict.fromkeys(student_ids))
+    for i in range(0, len(unique_ids), 100):
+        request_items = {
+            'Users': {
+                'Keys': [{'userId': student_id, 'role': 'student'} for student_id in unique_ids[i:i + 100]],
+                'ProjectionExpression': STUDENT_PROJECTION,
+                'ExpressionAttributeNames': STUDENT_PROJECTION_NAMES
+            }
+        }
+        
+        attempt = 0
+        while request_items:
+            response = dynamodb.batch_get_item(RequestItems=request_items)
+            for student in response.get('Responses', {}).get('Users', []):
+                students_by_id[student.get('userId')] = student
+            
+            request_items = response.get('UnprocessedKeys') or {}
+            if request_items:
+                if attempt >= 5:
+                    print(f"Giving up on {len(request_items['Users']['Keys'])} unprocessed student keys")
+                    break
+                # Exponential backoff before retrying throttled keys
+                time.sleep(min(0.05 * (2 ** attempt), 1.0))
+                attempt += 1
+    
+    return students_by_id
+
+def student_email_fields(submission, student, class_average):
+    """Per-student template fields for the parent email"""
+    student_score = submission.get('final_score', 0)
+    max_score = submission.get('max_score', 100)
+    percentage = round((student_score / max_score) * 100) if max_score > 0 else 0
+    
+    above_average = student_score > class_average
+    performance_text = (
+        "Your child scored above the class average. Excellent work!"
+        if above_average
+        else "Your child scored below the class average. Additional support may be helpful."
+    )
+    
+    return {
+        'student_name': student.get('name', 'Student'),
+        'student_score': student_score,
+        'max_score': max_score,
+        'percentage': percentage,
+        'class_average': class_average,
+        'performance_color': 'green' if above_average else 'orange',
+        'performance_text': performance_text
+    }
+
+def prepare_notification(submission, student, assignment_id, class_average):
+    """Check a student's parent can be emailed and claim the notification.
+    
+    Returns (detail, pending); pending is None when there is nothing to send.
+    """
+    student_id = submission.get('student_id')
+    
     try:
-        gmail_user = os.environ['GMAIL_USER']
-        gmail_password = os.environ['GMAIL_APP_PASSWORD']
+        if not student:
+            return {
+                'studentId': student_id,
+                'status': 'student_not_found'
+            }, None
         
-        msg = MIMEMultipart('alternative')
-        msg['Subject'] = subject
-        msg['From'] = gmail_user
-        msg['To'] = to_email
+        parent_email = student.get('parentEmail')
+        student_name = student.get('name', 'Student')
         
-        html_part = MIMEText(html_body, 'html')
-        msg.attach(html_part)
+        if not parent_email:
+            return {
+                'studentId': student_id,
+                'studentName': student_name,
+                'status': 'no_parent_email'
+            }, None
         
-        # Connect to Gmail SMTP
-        server = smtplib.SMTP_SSL('smtp.gmail.com', 465)
-        server.login(gmail_user, gmail_password)
-        server.sendmail(gmail_user, to_email, msg.as_string())
-        server.quit()
+        submission_key = {
+            'submission_id': submission.get('submission_id'),
+            'assignment_id': assignment_id
+        }
         
-        return True, None
+        # Claim the notification with one conditional write before sending, so repeat
+        # invocations and Lambda retries never email the same parent twice; the claim
+        # stays 'sending' until settle_claims records the outcome
+        now = datetime.utcnow()
+        try:
+            submissions_table.update_item(
+                Key=submission_key,
+                UpdateExpression='SET parent_notified = :notified, parent_notification_claimed_at = :timestamp, parent_notification_status = :sending',
+                ConditionExpression=(
+                    'attribute_not_exists(parent_notified) OR parent_notified = :not_notified '
+                    'OR (parent_notification_status = :sending AND parent_notification_claimed_at < :stale_before)'
+                ),
+                ExpressionAttributeValues={
+                    ':notified': True,
+                    ':not_notified': False,
+                    ':timestamp': now.isoformat(),
+                    ':sending': 'sending',
+                    ':stale_before': (now - timedelta(seconds=CLAIM_TIMEOUT_SECONDS)).isoformat()
+                }
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+            return {
+                'studentId': student_id,
+                'studentName': student_name,
+                'status': 'already_notified'
+            }, None
+        
+        detail = {
+            'studentId': student_id,
+            'studentName': student_name,
+            'parentEmail': parent_email
+        }
+        pending = {
+            'submission_key': submission_key,
+            'fields': student_email_fields(submission, student, class_average)
+        }
+        return detail, pending
+        
+    except Exception as e:
+        print(f"Error processing student {student_id}: {e}")
+        return {
+            'studentId': student_id,
+            'status': 'failed',
+            'error': str(e)
+        }, None
+
+SENT_EXPRESSION = 'SET parent_notification_status = :status, parent_notification_sent_at = :timestamp'
+RELEASE_EXPRESSION = 'SET parent_notified = :notified, parent_notification_status = :status'
+RELEASE_VALUES = {':notified': False, ':status': 'failed'}
+
+def update_claim(submission_key, expression, values):
+    """Record one claim's outcome"""
+    try:
+        submissions_table.update_item(
+            Key=submission_key,
+            UpdateExpression=expression,
+            ExpressionAttributeValues=values
+        )
+    except Exception as e:
+        print(f"Could not update notification claim for {submission_key['submission_id']}: {e}")
+
+def update_claims(submission_keys, expression, values):
+    """Record many claims' outcomes with TransactWriteItems (100 per call), falling back to single updates"""
+    for i in range(0, len(submission_keys), 100):
+        chunk = submission_keys[i:i + 100]
+        if len(chunk) == 1:
+            update_claim(chunk[0], expression, values)
+            continue
+        try:
+            dynamodb.meta.client.transact_write_items(
+                TransactItems=[
+                    {
+                        'Update': {
+                            'TableName': submissions_table.name,
+                            'Key': submission_key,
+                            'UpdateExpression': expression,
+                            'ExpressionAttributeValues': values
+                        }
+                    }
+                    for submission_key in chunk
+                ]
+            )
+        except Exception as e:
+            print(f"Transactional claim update failed, updating one by one: {e}")
+            for submission_key in chunk:
+                update_claim(submission_key, expression, values)
+
+def settle_claims(prepared):
+    """Flip delivered claims to 'sent' and release failed ones so a later run can retry them"""
+    sent_keys = []
+    failed_keys = []
+    for detail, pending in prepared:
+        if pending is None:
+            continue
+        if detail['status'] == 'sent':
+            sent_keys.append(pending['submission_key'])
+        else:
+            failed_keys.append(pending['submission_key'])
+    
+    update_claims(sent_keys, SENT_EXPRESSION, {':status': 'sent', ':timestamp': datetime.utcnow().isoformat()})
+    update_claims(failed_keys, RELEASE_EXPRESSION, RELEASE_VALUES)
+
+def finish_notification(detail, pending, success, error):
+    """Record a send outcome on the detail; the claim itself is settled later in batches"""
+    fields = pending['fields']
+    if success:
+        detail['status'] = 'sent'
+        detail['score'] = f"{fields['student_score']}/{fields['max_score']}"
+        return detail
+    
+    detail['status'] = 'failed'
+    detail['error'] = error
+    return detail
+
+def notify_parent(smtp, submission, student, assignment_id, class_average, email_subject, email_template):
+    """Email one student's parent over SMTP and return (detail, pending) for settle_claims"""
+    detail, pending = prepare_notification(submission, student, assignment_id, class_average)
+    if pending is None:
+        return detail, pending
+    
+    try:
+        html_body = email_template.substitute(pending['fields'])
+        success, error = smtp.send(detail['parentEmail'], email_subject, html_body)
     except Exception as e:
-        return False, str(e)
+        success, error = False, str(e)
+    return finish_notification(detail, pending, success, error), pending
+
+def send_bulk_notifications(prepared, assignment_fields):
+    """Send every claimed notification through SES SendBulkEmail, 50 recipients per call"""
+    default_data = json.dumps(assignment_fields, default=decimal_default)
+    
+    details = [detail for detail, _ in prepared]
+    to_send = [(detail, pending) for detail, pending in prepared if pending is not None]
+    for i in range(0, len(to_send), SES_BULK_MAX):
+        chunk = to_send[i:i + SES_BULK_MAX]
+        entries = [
+            {
+                'Destination': {'ToAddresses': [detail['parentEmail']]},
+                'ReplacementEmailContent': {
+                    'ReplacementTemplate': {
+                        # SES uses the default data only when an entry has none, so each entry carries it all
+                        'ReplacementTemplateData': json.dumps({**assignment_fields, **pending['fields']}, default=decimal_default)
+                    }
+                }
+            }
+            for detail, pending in chunk
+        ]
+        
+        try:
+            response = ses.send_bulk_email(
+                FromEmailAddress=SES_FROM_EMAIL,
+                DefaultContent={
+                    'Template': {
+                        'TemplateName': SES_TEMPLATE_NAME,
+                        'TemplateData': default_data
+                    }
+                },
+                BulkEmailEntries=entries
+            )
+            results = response['BulkEmailEntryResults']
+        except Exception as e:
+            results = [{'Status': 'FAILED', 'Error': str(e)}] * len(chunk)
+        
+        # Results come back in the same order as the entries
+        for (detail, pending), result in zip(chunk, results):
+            success = result.get('Status') == 'SUCCESS'
+            finish_notification(detail, pending, success, None if success else result.get('Error', result.get('Status')))
+    
+    settle_claims(prepared)
+    return details
 
 def lambda_handler(event, context):
     try:
@@ -63,12 +547,16 @@ def lambda_handler(event, context):
                 })
             }
         
-        # 1. Get assignment details
-        assignment_response = assignments_table.get_item(
-            Key={'assignment_id': assignment_id}
-        )
+        # 1-3. Assignment, teacher and submissions are independent reads, so fetch them together
+        # (nothing is sent until the ownership check below passes)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            teacher_future = executor.submit(get_teacher_name, teacher_id)
+            submissions_future = executor.submit(query_assignment_submissions, assignment_id)
+            assignment = get_assignment(assignment_id)
+            teacher_name = teacher_future.result()
+            submissions = submissions_future.result()
         
-        if 'Item' not in assignment_response:
+        if not assignment:
             return {
                 'statusCode': 404,
                 'headers': {
@@ -81,8 +569,6 @@ def lambda_handler(event, context):
                 })
             }
         
-        assignment = assignment_response['Item']
-        
         # Verify teacher owns this assignment
         if assignment.get('teacher_id') != teacher_id:
             return {
@@ -97,21 +583,6 @@ def lambda_handler(event, context):
                 })
             }
         
-        # 2. Get teacher info
-        teacher_response = users_table.get_item(
-            Key={'userId': teacher_id, 'role': 'teacher'}
-        )
-        teacher = teacher_response.get('Item', {})
-        teacher_name = teacher.get('name', 'Teacher')
-        
-        # 3. Get all submissions for this assignment
-        submissions_response = submissions_table.query(
-            IndexName='AssignmentStudentIndex',
-            KeyConditionExpression=Key('assignment_id').eq(assignment_id)
-        )
-        
-        submissions = submissions_response.get('Items', [])
-        
         if not submissions:
             return {
                 'statusCode': 200,
@@ -129,145 +600,71 @@ def lambda_handler(event, context):
                 })
             }
         
-        # Filter completed submissions only
-        completed_submissions = [s for s in submissions if s.get('evaluation_status') == 'completed']
+        # Filter completed submissions, collect their student ids and total their scores
+        # for the class average in one pass
+        completed_submissions = []
+        student_ids = []
+        score_total = 0
+        scored_count = 0
+        for submission in submissions:
+            if submission.get('evaluation_status') == 'completed':
+                completed_submissions.append(submission)
+                student_ids.append(submission.get('student_id'))
+                score = submission.get('final_score')
+                if score:
+                    score_total += score
+                    scored_count += 1
+        
+        class_average = round(score_total / scored_count) if scored_count else 0
+        
+        # 4. Look up all students up front, then send emails to parents
+        # (I/O-bound, so students are processed concurrently)
+        students_by_id = batch_get_students(student_ids)
         
-        # Calculate class average
-        class_average = 0
-        if completed_submissions:
-            scores = [s.get('final_score', 0) for s in completed_submissions if s.get('final_score')]
-            class_average = round(sum(scores) / len(scores)) if scores else 0
+        assignment_fields = assignment_email_fields(assignment, class_id, teacher_name)
+        
+        if ses:
+            # Register the template before claiming anything, so a setup failure leaves no claims behind
+            ensure_ses_template()
+            
+            # Claim concurrently, then deliver in SES bulk calls
+            with ThreadPoolExecutor(max_workers=NOTIFY_WORKERS) as executor:
+                prepared = list(executor.map(
+                    lambda submission, student_id: prepare_notification(
+                        submission, students_by_id.get(student_id), assignment_id, class_average
+                    ),
+                    completed_submissions, student_ids
+                ))
+            details = send_bulk_notifications(prepared, assignment_fields)
+        else:
+            email_subject = f"Assignment Results - {assignment.get('title', 'Assignment')}"
+            email_template = build_email_template(assignment_fields)
+            
+            # Each worker keeps one logged-in SMTP connection for all of its recipients
+            with SMTPSender() as smtp, ThreadPoolExecutor(max_workers=NOTIFY_WORKERS) as executor:
+                prepared = list(executor.map(
+                    lambda submission, student_id: notify_parent(
+                        smtp, submission, students_by_id.get(student_id),
+                        assignment_id, class_average, email_subject, email_template
+                    ),
+                    completed_submissions, student_ids
+                ))
+            settle_claims(prepared)
+            details = [detail for detail, _ in prepared]
         
-        # 4. Send emails to parents
         emails_sent = 0
         emails_failed = 0
         no_parent_email = 0
-        details = []
-        
-        for submission in completed_submissions:
-            student_id = submission.get('student_id')
-            
-            try:
-                # Get student info
-                student_response = users_table.get_item(
-                    Key={'userId': student_id, 'role': 'student'}
-                )
-                
-                if 'Item' not in student_response:
-                    details.append({
-                        'studentId': student_id,
-                        'status': 'student_not_found'
-                    })
-                    continue
-                
-                student = student_response['Item']
-                parent_email = student.get('parentEmail')
-                
-                if not parent_email:
-                    no_parent_email += 1
-                    details.append({
-                        'studentId': student_id,
-                        'studentName': student.get('name', 'Student'),
-                        'status': 'no_parent_email'
-                    })
-                    continue
-                
-                # Prepare email data
-                student_name = student.get('name', 'Student')
-                student_score = submission.get('final_score', 0)
-                max_score = submission.get('max_score', 100)
-                percentage = round((student_score / max_score) * 100) if max_score > 0 else 0
-                
-                performance_text = (
-                    "Your child scored above the class average. Excellent work!"
-                    if student_score > class_average
-                    else "Your child scored below the class average. Additional support may be helpful."
-                )
-                
-                # Email content
-                subject = f"Assignment Results - {assignment.get('title', 'Assignment')}"
-                
-                html_body = f"""
-                <html>
-                <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-                    <h2>Dear Parent/Guardian of {student_name},</h2>
-                    
-                    <p>Your child has completed the assignment "<strong>{assignment.get('title', 'Assignment')}</strong>" 
-                    for {assignment.get('subject', 'the subject')}.</p>
-                    
-                    <div style="background-color: #f4f4f4; padding: 15px; border-radius: 5px; margin: 20px 0;">
-                        <h3 style="margin-top: 0;">Student Performance:</h3>
-                        <p><strong>Score:</strong> {student_score}/{max_score} ({percentage}%)</p>
-                        <p><strong>Class Average:</strong> {class_average}%</p>
-                        <p style="color: {'green' if student_score > class_average else 'orange'};">
-                            {performance_text}
-                        </p>
-                    </div>
-                    
-                    <h3>Assignment Details:</h3>
-                    <ul>
-                        <li><strong>Subject:</strong> {assignment.get('subject', 'N/A')}</li>
-                        <li><strong>Class:</strong> {assignment.get('class_info', class_id or 'N/A')}</li>
-                        <li><strong>Due Date:</strong> {assignment.get('due_date', 'N/A')}</li>
-                        <li><strong>Teacher:</strong> {teacher_name}</li>
-                    </ul>
-                    
-                    <p>If you have questions, please contact the school.</p>
-                    
-                    <p style="margin-top: 30px;">
-                        Best regards,<br>
-                        <strong>{teacher_name}</strong><br>
-                        Sahayak AI Learning Platform
-                    </p>
-                </body>
-                </html>
-                """
-                
-                # Send email
-                success, error = send_email(parent_email, subject, html_body)
-                
-                if success:
-                    emails_sent += 1
-                    
-                    # Update submission record
-                    submissions_table.update_item(
-                        Key={
-                            'submission_id': submission.get('submission_id'),
-                            'assignment_id': assignment_id
-                        },
-                        UpdateExpression='SET parent_notified = :notified, parent_notification_sent_at = :timestamp, parent_notification_status = :status',
-                        ExpressionAttributeValues={
-                            ':notified': True,
-                            ':timestamp': datetime.utcnow().isoformat(),
-                            ':status': 'sent'
-                        }
-                    )
-                    
-                    details.append({
-                        'studentId': student_id,
-                        'studentName': student_name,
-                        'parentEmail': parent_email,
-                        'status': 'sent',
-                        'score': f'{student_score}/{max_score}'
-                    })
-                else:
-                    emails_failed += 1
-                    details.append({
-                        'studentId': student_id,
-                        'studentName': student_name,
-                        'parentEmail': parent_email,
-                        'status': 'failed',
-                        'error': error
-                    })
-                
-            except Exception as email_error:
-                print(f"Error processing student {student_id}: {email_error}")
+        already_notified = 0
+        for detail in details:
+            if detail['status'] == 'sent':
+                emails_sent += 1
+            elif detail['status'] == 'failed':
                 emails_failed += 1
-                details.append({
-                    'studentId': student_id,
-                    'status': 'failed',
-                    'error': str(email_error)
-                })
+            elif detail['status'] == 'no_parent_email':
+                no_parent_email += 1
+            elif detail['status'] == 'already_notified':
+                already_notified += 1
         
         return {
             'statusCode': 200,
@@ -283,6 +680,7 @@ def lambda_handler(event, context):
                     'emailsSent': emails_sent,
                     'emailsFailed': emails_failed,
                     'noParentEmail': no_parent_email,
+                    'alreadyNotified': already_notified,
                     'classAverage': class_average,
                     'assignmentTitle': assignment.get('title', 'Assignment'),
                     'details': details
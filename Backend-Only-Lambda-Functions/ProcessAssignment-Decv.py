@@ -1,13 +1,22 @@
 import json
+import os
+import io
+import base64
+import hashlib
 import boto3
 import uuid
 import re
 import time
+from collections import OrderedDict
 from datetime import datetime
+from boto3.dynamodb.types import TypeSerializer
+from boto3.s3.transfer import TransferConfig
 from botocore.config import Config
+from concurrent.futures import ThreadPoolExecutor
 
 # Configure boto3 for better performance
 boto_config = Config(
+    max_pool_connections=50,
     retries=dict(max_attempts=3),
     read_timeout=300,
     connect_timeout=300
@@ -17,17 +26,150 @@ s3_client = boto3.client('s3', config=boto_config)
 textract_client = boto3.client('textract', config=boto_config)
 bedrock_runtime = boto3.client('bedrock-runtime', region_name='us-east-1', config=boto_config)
 dynamodb = boto3.resource('dynamodb', config=boto_config)
+# Plain client for the item-sized writes: items are marshalled once with serialize_value
+# instead of going through the resource layer's per-request shape transformation
+dynamodb_client = boto3.client('dynamodb', config=boto_config)
 lambda_client = boto3.client('lambda', config=boto_config)
 
+# Large uploads go up as concurrent multipart parts instead of a single PUT
+UPLOAD_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    max_concurrency=10,
+    use_threads=True
+)
+
+# Resolved once per container so warm invocations skip the resource lookup
+ASSIGNMENTS_TABLE_NAME = 'Assignments-dev'
+assignments_table = dynamodb.Table(ASSIGNMENTS_TABLE_NAME)
+serialize_value = TypeSerializer().serialize
+BUCKET_NAME = 'assignment-system-dev'
+
+# Open the upload path's S3, DynamoDB and Lambda connections during INIT (which provisioned
+# concurrency runs ahead of traffic) so the first request skips the TLS handshakes
+for warm_up in (
+    lambda: s3_client.head_bucket(Bucket=BUCKET_NAME),
+    dynamodb_client.describe_endpoints,
+    lambda_client.get_account_settings
+):
+    try:
+        warm_up()
+    except Exception as e:
+        print(f"Client warm-up skipped: {str(e)}")
+
+# When both are set, async PDF processing hands off to Textract and exits; Textract's SNS
+# completion notification re-invokes this function to finish the pipeline
+TEXTRACT_SNS_TOPIC_ARN = os.environ.get('TEXTRACT_SNS_TOPIC_ARN')
+TEXTRACT_SNS_ROLE_ARN = os.environ.get('TEXTRACT_SNS_ROLE_ARN')
+
+# Verbose request tracing (full event dumps, progress prints) only when LOG_LEVEL=DEBUG
+DEBUG = os.environ.get('LOG_LEVEL') == 'DEBUG'
+
+# Response headers shared by every API Gateway return path
+CORS_HEADERS = {
+    'Content-Type': 'application/json',
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token',
+    'Access-Control-Allow-Methods': 'POST,OPTIONS,GET'
+}
+
+# Upload MIME type -> stored file extension (unknown types are treated as PDF)
+MIME_TO_EXT = {
+    'text/plain': 'txt',
+    'application/pdf': 'pdf',
+    'image/jpeg': 'jpg',
+    'image/png': 'png',
+    'image/tiff': 'tiff'
+}
+
+# Bedrock (Titan) prompts and generation settings, built once per container
+QUESTION_EXTRACTION_PROMPT = """
+        You are an assistant helping teachers process assignments. 
+        Extract all the questions from the following text. 
+        Do not answer them — just return a clean, numbered list of the questions exactly as written. 
+        The text may include subjects like Math, Science, Literature, or History. 
+        Return results in this format:
+
+        1. <question text>
+        2. <question text>
+        3. <question text>
+
+        Assignment text:
+        {text}
+        """
+QUESTION_EXTRACTION_GENERATION_CONFIG = {
+    "maxTokenCount": 700,
+    "temperature": 0.2,
+    "topP": 0.9
+}
+
+ANSWER_PROMPT = """
+        You are an expert teacher assistant.
+        Answer the following student question clearly, step by step if needed.
+        Subject may be math, science, literature, history, or general knowledge.
+        Provide a well-structured answer with examples if applicable.
+        
+        Question: {question}
+        """
+ANSWER_GENERATION_CONFIG = {
+    "maxTokenCount": 500,
+    "temperature": 0.3,
+    "topP": 0.9
+}
+
+# Bedrock question-extraction output cached across warm invocations (so async retries
+# of the same file skip the model call): sha256 of the prompt excerpt -> (fetched_at, text)
+BEDROCK_CACHE_TTL = 600
+BEDROCK_CACHE_MAX = 64
+_bedrock_cache = OrderedDict()
+
+# Caps on extracted questions; each kept question costs a Bedrock answer call
+MAX_DIRECT_QUESTIONS = 5
+MAX_BEDROCK_QUESTIONS = 10
+
+# Concurrent Bedrock answer calls per assignment (kept below max_pool_connections)
+ANSWER_WORKERS = 8
+
+# Question parsing patterns, compiled once per container instead of on every call
+_Q_PAT1 = re.compile(r'(?:Question|Problem)\s*(\d+)\s*[:\.]\s*(.+?)(?=(?:Question|Problem)\s*\d+|$)', re.IGNORECASE | re.DOTALL)
+# Item numbers: 1-4 digits at the start of a digit run, not a decimal point. With an unbounded \d+
+# both the match and the lookahead rescanned long OCR digit runs from every position (quadratic time)
+_Q_PAT2 = re.compile(r'(?<!\d)(\d{1,4})\.(?!\d)\s*(.*?)(?=(?<!\d)\d{1,4}\.(?!\d)|$)', re.DOTALL)
+_HEADER_PAT = re.compile(r'^(MATHEMATICS|ASSIGNMENT|GRADE|CLASS)', re.IGNORECASE)
+# One scan for clean_text_preserve_content: x-squared notation, spaced-out digits, whitespace runs
+_CLEAN_PAT = re.compile(r'(x\s*[\^²2]\s*)|(\d)\s+(\d)|\s+')
+_WS_PAT = re.compile(r'\s+')
+_ANSWER_SPLIT_PAT = re.compile(r'\b(?:Answer|Solution|Hint)[\s\:]', re.IGNORECASE)
+_FILENAME_TEACHER_PAT = re.compile(r'^([a-zA-Z0-9_-]+)_')
+_Q_LINE_PAT = re.compile(r'^(?:Q(?:uestion)?\s*)?(\d+)[\.\:\-\)]\s*(.+)', re.IGNORECASE)
+# Sentences are iterated lazily so extraction stops scanning once it has enough questions
+_SENTENCE_PAT = re.compile(r'[^.!?]+')
+
+# Question keyword checks as single case-insensitive scans (substring matches, like the
+# word lists they replace); classification keeps its problem-solving > explanation > definition order
+_QUESTION_INDICATOR_PAT = re.compile(
+    r'solve|calculate|find|determine|explain|describe|what|how|why|compute|evaluate|derive',
+    re.IGNORECASE
+)
+_PROBLEM_SOLVING_PAT = re.compile(r'solve|calculate|find|compute', re.IGNORECASE)
+_EXPLANATION_PAT = re.compile(r'explain|describe|discuss', re.IGNORECASE)
+_DEFINITION_PAT = re.compile(r'define|what is', re.IGNORECASE)
+
 def lambda_handler(event, context):
     """Main Lambda handler with async processing support"""
-    print("Starting assignment processing")
-    print(f"Event: {json.dumps(event)}")
+    if DEBUG:
+        print("Starting assignment processing")
+        print(f"Event: {json.dumps(event)}")
     
     try:
+        # Textract completion notification (SNS) for a PDF started by async processing
+        records = event.get('Records')
+        if records and records[0].get('EventSource') == 'aws:sns':
+            return handle_textract_notification(records)
+        
         # Check if this is an async processing invocation
         if event.get('async_processing'):
-            print("🔄 Processing async invocation")
+            if DEBUG:
+                print("🔄 Processing async invocation")
             return handle_async_processing(event)
         
         # Handle CORS preflight
@@ -50,24 +192,22 @@ def lambda_handler(event, context):
         traceback.print_exc()
         return error_response(str(e))
 
+def marshal_values(values):
+    """Convert a dict of plain Python values to DynamoDB attribute values"""
+    return {key: serialize_value(value) for key, value in values.items()}
+
 def cors_response():
     """Return CORS preflight response"""
     return {
         'statusCode': 200,
-        'headers': {
-            'Content-Type': 'application/json',
-            'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token',
-            'Access-Control-Allow-Methods': 'POST,OPTIONS,GET'
-        },
+        'headers': CORS_HEADERS,
         'body': json.dumps({'message': 'OK'})
     }
 
 def handle_upload_format(body, context):
     """Handle new upload format - Returns immediately after S3 upload"""
-    print("📤 Processing upload format request")
-    
-    import base64
+    if DEBUG:
+        print("📤 Processing upload format request")
     
     # Extract fields
     title = body.get('title')
@@ -83,7 +223,7 @@ def handle_upload_format(body, context):
     
     # Generate IDs
     assignment_id = str(uuid.uuid4())
-    bucket_name = 'assignment-system-dev'
+    bucket_name = BUCKET_NAME
     
     # Decode file and detect content type
     try:
@@ -91,26 +231,19 @@ def handle_upload_format(body, context):
         file_extension = 'pdf'
         
         if file_data.startswith('data:'):
-            file_parts = file_data.split(',')
-            if len(file_parts) != 2:
+            # data:<mime>[;base64],<payload> - split the header off once
+            header, separator, payload = file_data.partition(',')
+            if not separator or ',' in payload:
                 return error_response('Invalid file format')
             
             # Extract MIME type
-            mime_match = re.match(r'data:([^;]+)', file_parts[0])
-            if mime_match:
-                content_type = mime_match.group(1)
-                
-                # Map MIME to extension
-                mime_to_ext = {
-                    'text/plain': 'txt',
-                    'application/pdf': 'pdf',
-                    'image/jpeg': 'jpg',
-                    'image/png': 'png',
-                    'image/tiff': 'tiff'
-                }
-                file_extension = mime_to_ext.get(content_type, 'pdf')
+            semicolon = header.find(';')
+            mime_type = header[5:semicolon] if semicolon >= 0 else header[5:]
+            if mime_type:
+                content_type = mime_type
+                file_extension = MIME_TO_EXT.get(content_type, 'pdf')
             
-            file_content = base64.b64decode(file_parts[1])
+            file_content = base64.b64decode(payload)
         else:
             file_content = base64.b64decode(file_data)
     except Exception as e:
@@ -120,55 +253,78 @@ def handle_upload_format(body, context):
     file_key = f"assignments/uploaded/{assignment_id}/{title.replace(' ', '_')}.{file_extension}"
     
     try:
-        s3_client.put_object(
-            Bucket=bucket_name,
-            Key=file_key,
-            Body=file_content,
-            ContentType=content_type
+        s3_client.upload_fileobj(
+            io.BytesIO(file_content),
+            bucket_name,
+            file_key,
+            ExtraArgs={'ContentType': content_type},
+            Config=UPLOAD_TRANSFER_CONFIG
         )
-        print(f"✅ Uploaded file to s3://{bucket_name}/{file_key}")
+        if DEBUG:
+            print(f"✅ Uploaded file to s3://{bucket_name}/{file_key}")
     except Exception as e:
         return error_response(f'Failed to upload file to S3: {str(e)}')
     
-    # Store initial assignment record in DynamoDB with 'processing' status
-    try:
-        table = dynamodb.Table('Assignments-dev')
-        table.put_item(Item={
-            'assignment_id': assignment_id,
-            'teacher_id': teacher_id,
-            'title': title,
-            'description': description,
-            'deadline': deadline,
-            'file_location': file_key,
-            'subject': subject,
-            'class_info': class_info,
-            'status': 'processing',
-            'created_at': datetime.now().isoformat(),
-            'updated_at': datetime.now().isoformat()
-        })
-        print(f"✅ Created DynamoDB record with status: processing")
-    except Exception as e:
-        print(f"⚠️ Failed to create initial DynamoDB record: {e}")
-    
-    # Invoke async processing
-    try:
-        lambda_client.invoke(
+    now = datetime.now()
+    timestamp = now.isoformat()
+    initial_item = {
+        'assignment_id': assignment_id,
+        'teacher_id': teacher_id,
+        'title': title,
+        'description': description,
+        'deadline': deadline,
+        'file_location': file_key,
+        'subject': subject,
+        'class_info': class_info,
+        'status': 'processing',
+        'created_at': timestamp,
+        'created_date_bucket': now.strftime('%Y-%m'),
+        'updated_at': timestamp
+    }
+    async_payload = json.dumps({
+        'async_processing': True,
+        'file_key': file_key,
+        'bucket_name': bucket_name,
+        'teacher_id': teacher_id,
+        'assignment_id': assignment_id,
+        'subject': subject,
+        'class_info': class_info,
+        'title': title
+    }, separators=(',', ':'))
+    
+    # The 'processing' record and the async self-invoke are independent, so overlap them
+    # on the path the caller is waiting on. The put is create-only so a slow write can never
+    # land on top of a record the worker already finished.
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        put_future = executor.submit(
+            dynamodb_client.put_item,
+            TableName=ASSIGNMENTS_TABLE_NAME,
+            Item=marshal_values(initial_item),
+            ConditionExpression='attribute_not_exists(assignment_id)'
+        )
+        invoke_future = executor.submit(
+            lambda_client.invoke,
             FunctionName=context.function_name,
             InvocationType='Event',  # Fire and forget
-            Payload=json.dumps({
-                'async_processing': True,
-                'file_key': file_key,
-                'bucket_name': bucket_name,
-                'teacher_id': teacher_id,
-                'assignment_id': assignment_id,
-                'subject': subject,
-                'class_info': class_info,
-                'title': title
-            })
+            Payload=async_payload
         )
-        print(f"✅ Invoked async processing for assignment {assignment_id}")
-    except Exception as e:
-        print(f"⚠️ Failed to invoke async processing: {e}")
+        
+        try:
+            put_future.result()
+            if DEBUG:
+                print(f"✅ Created DynamoDB record with status: processing")
+        except dynamodb_client.exceptions.ConditionalCheckFailedException:
+            # The worker wrote first; keep its state and only add what it doesn't write
+            add_missing_fields(initial_item)
+        except Exception as e:
+            print(f"⚠️ Failed to create initial DynamoDB record: {e}")
+        
+        try:
+            invoke_future.result()
+            if DEBUG:
+                print(f"✅ Invoked async processing for assignment {assignment_id}")
+        except Exception as e:
+            print(f"⚠️ Failed to invoke async processing: {e}")
     
     # Return immediately (within 3-5 seconds)
     return {
@@ -188,9 +344,28 @@ def handle_upload_format(body, context):
         })
     }
 
+def add_missing_fields(item):
+    """Set each of item's fields that an earlier writer left unset on the existing record"""
+    fields = {key: value for key, value in item.items() if key != 'assignment_id'}
+    names = {f'#f{i}': key for i, key in enumerate(fields)}
+    values = {f':v{i}': value for i, value in enumerate(fields.values())}
+    try:
+        dynamodb_client.update_item(
+            TableName=ASSIGNMENTS_TABLE_NAME,
+            Key={'assignment_id': {'S': item['assignment_id']}},
+            UpdateExpression='SET ' + ', '.join(f'#f{i} = if_not_exists(#f{i}, :v{i})' for i in range(len(fields))),
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues=marshal_values(values)
+        )
+        if DEBUG:
+            print(f"✅ Record already written by async processing; filled in missing fields")
+    except Exception as e:
+        print(f"⚠️ Failed to fill in initial DynamoDB fields: {e}")
+
 def handle_async_processing(event):
     """Handle async processing without returning to API Gateway"""
-    print("🔄 Starting async background processing")
+    if DEBUG:
+        print("🔄 Starting async background processing")
     
     assignment_id = event['assignment_id']
     file_key = event['file_key']
@@ -200,30 +375,20 @@ def handle_async_processing(event):
     class_info = event.get('class_info', 'Default Class')
     
     try:
+        # PDFs can finish in a later invocation driven by Textract's SNS notification
+        if TEXTRACT_SNS_TOPIC_ARN and TEXTRACT_SNS_ROLE_ARN and file_key.lower().endswith('.pdf'):
+            job_id = start_textract_with_notification(bucket_name, file_key, assignment_id, teacher_id, subject, class_info)
+            print(f"✅ Textract job {job_id} started; processing resumes on completion")
+            return {'statusCode': 202, 'body': json.dumps({'status': 'extracting', 'job_id': job_id})}
+        
         # Extract text from file
-        print(f"📄 Extracting text from {file_key}")
+        if DEBUG:
+            print(f"📄 Extracting text from {file_key}")
         assignment_text = extract_text_from_file(bucket_name, file_key)
-        print(f"✅ Extracted {len(assignment_text)} characters")
-        
-        # Extract questions
-        print(f"🔍 Extracting questions...")
-        questions = extract_questions_smart(assignment_text)
-        print(f"✅ Extracted {len(questions)} questions")
-        
-        # Get file extension
-        file_extension = file_key.split('.')[-1]
+        if DEBUG:
+            print(f"✅ Extracted {len(assignment_text)} characters")
         
-        # Store file paths
-        processed_file_key = f"assignments/processed/{assignment_id}/assignment.{file_extension}"
-        answer_key_path = f"assignments/answer-keys/{assignment_id}/answer_key.json"
-        
-        # Process files in S3
-        print(f"📦 Processing S3 files...")
-        process_s3_files(s3_client, bucket_name, file_key, processed_file_key, answer_key_path, questions, assignment_id)
-        
-        # Update DynamoDB with questions
-        print(f"💾 Updating DynamoDB with questions...")
-        update_dynamodb_with_questions(assignment_id, teacher_id, processed_file_key, answer_key_path, questions, subject, class_info)
+        complete_assignment_processing(assignment_id, assignment_text, bucket_name, file_key, teacher_id, subject, class_info)
         
         print(f"✅ Async processing completed for assignment {assignment_id}")
         return {'statusCode': 200, 'body': json.dumps({'status': 'completed'})}
@@ -233,42 +398,166 @@ def handle_async_processing(event):
         import traceback
         traceback.print_exc()
         
-        # Update DynamoDB with error status
-        try:
-            table = dynamodb.Table('Assignments-dev')
-            table.update_item(
-                Key={'assignment_id': assignment_id},
-                UpdateExpression='SET #status = :status, error_message = :error, updated_at = :updated',
-                ExpressionAttributeNames={'#status': 'status'},
-                ExpressionAttributeValues={
-                    ':status': 'failed',
-                    ':error': str(e),
-                    ':updated': datetime.now().isoformat()
-                }
-            )
-        except Exception as db_error:
-            print(f"Failed to update error status in DynamoDB: {db_error}")
-        
+        mark_assignment_failed(assignment_id, e)
         return {'statusCode': 500, 'body': json.dumps({'error': str(e)})}
 
-def update_dynamodb_with_questions(assignment_id, teacher_id, file_key, answer_key_path, questions, subject, class_info):
-    """Update DynamoDB record with extracted questions"""
+def complete_assignment_processing(assignment_id, assignment_text, bucket_name, file_key, teacher_id, subject, class_info):
+    """Turn extracted text into questions, write the S3 artifacts and update the assignment record"""
+    # Extract questions
+    if DEBUG:
+        print(f"🔍 Extracting questions...")
+    questions = extract_questions_smart(assignment_text)
+    if DEBUG:
+        print(f"✅ Extracted {len(questions)} questions")
+    
+    # Get file extension
+    file_extension = file_key.split('.')[-1]
+    
+    # Store file paths
+    processed_file_key = f"assignments/processed/{assignment_id}/assignment.{file_extension}"
+    answer_key_path = f"assignments/answer-keys/{assignment_id}/answer_key.json"
+    
+    # Process files in S3
+    if DEBUG:
+        print(f"📦 Processing S3 files...")
+    process_s3_files(s3_client, bucket_name, file_key, processed_file_key, answer_key_path, questions, assignment_id)
+    
+    # Update DynamoDB with questions
+    if DEBUG:
+        print(f"💾 Updating DynamoDB with questions...")
+    update_dynamodb_with_questions(assignment_id, teacher_id, processed_file_key, answer_key_path, questions, subject, class_info)
+
+def mark_assignment_failed(assignment_id, error):
+    """Record a processing failure on the assignment"""
     try:
-        table = dynamodb.Table('Assignments-dev')
-        
-        table.update_item(
+        assignments_table.update_item(
             Key={'assignment_id': assignment_id},
-            UpdateExpression='SET file_location = :file, answer_key_location = :answer, questions = :questions, #status = :status, updated_at = :updated',
+            UpdateExpression='SET #status = :status, error_message = :error, updated_at = :updated',
             ExpressionAttributeNames={'#status': 'status'},
             ExpressionAttributeValues={
+                ':status': 'failed',
+                ':error': str(error),
+                ':updated': datetime.now().isoformat()
+            }
+        )
+    except Exception as db_error:
+        print(f"Failed to update error status in DynamoDB: {db_error}")
+
+def start_textract_with_notification(bucket_name, file_key, assignment_id, teacher_id, subject, class_info):
+    """Start a PDF text detection job that reports completion to SNS, tagged with the assignment"""
+    response = textract_client.start_document_text_detection(
+        DocumentLocation={
+            'S3Object': {
+                'Bucket': bucket_name,
+                'Name': file_key
+            }
+        },
+        NotificationChannel={
+            'SNSTopicArn': TEXTRACT_SNS_TOPIC_ARN,
+            'RoleArn': TEXTRACT_SNS_ROLE_ARN
+        },
+        JobTag=assignment_id
+    )
+    job_id = response['JobId']
+    
+    # Also records what the notification handler needs, in case the initial 'processing' write never landed
+    assignments_table.update_item(
+        Key={'assignment_id': assignment_id},
+        UpdateExpression=(
+            'SET textract_job_id = :job, updated_at = :updated, '
+            'teacher_id = if_not_exists(teacher_id, :teacher), '
+            '#subject = if_not_exists(#subject, :subject), '
+            'class_info = if_not_exists(class_info, :class_info), '
+            'file_location = if_not_exists(file_location, :file)'
+        ),
+        ExpressionAttributeNames={'#subject': 'subject'},
+        ExpressionAttributeValues={
+            ':job': job_id,
+            ':updated': datetime.now().isoformat(),
+            ':teacher': teacher_id,
+            ':subject': subject,
+            ':class_info': class_info,
+            ':file': file_key
+        }
+    )
+    return job_id
+
+def handle_textract_notification(records):
+    """Finish processing for each Textract job reported complete over SNS"""
+    for record in records:
+        message = json.loads(record['Sns']['Message'])
+        job_id = message['JobId']
+        status = message['Status']
+        assignment_id = message.get('JobTag')
+        print(f"🔔 Textract job {job_id} for assignment {assignment_id}: {status}")
+        
+        if not assignment_id:
+            print(f"⚠️ Textract notification without JobTag, skipping job {job_id}")
+            continue
+        
+        try:
+            if status not in ('SUCCEEDED', 'PARTIAL_SUCCESS'):
+                raise Exception(f"Textract job failed: {status}")
+            
+            assignment = assignments_table.get_item(Key={'assignment_id': assignment_id}).get('Item')
+            if not assignment:
+                print(f"⚠️ Assignment {assignment_id} not found, skipping job {job_id}")
+                continue
+            
+            location = message.get('DocumentLocation', {})
+            bucket_name = location.get('S3Bucket', BUCKET_NAME)
+            file_key = location.get('S3ObjectName') or assignment.get('file_location')
+            if not file_key:
+                raise Exception(f"No document location for assignment {assignment_id}")
+            
+            assignment_text = extract_text_from_textract_response(textract_client, job_id)
+            complete_assignment_processing(
+                assignment_id, assignment_text, bucket_name, file_key, assignment.get('teacher_id', 'default_teacher'),
+                assignment.get('subject', 'General'), assignment.get('class_info', 'Default Class')
+            )
+            print(f"✅ Async processing completed for assignment {assignment_id}")
+            
+        except Exception as e:
+            print(f"❌ Processing after Textract notification failed: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            mark_assignment_failed(assignment_id, e)
+    
+    return {'statusCode': 200, 'body': json.dumps({'status': 'completed'})}
+
+def update_dynamodb_with_questions(assignment_id, teacher_id, file_key, answer_key_path, questions, subject, class_info):
+    """Update DynamoDB record with extracted questions"""
+    try:
+        now = datetime.now()
+        timestamp = now.isoformat()
+        # Upsert: fills in the creation fields too if the initial 'processing' write never landed
+        dynamodb_client.update_item(
+            TableName=ASSIGNMENTS_TABLE_NAME,
+            Key={'assignment_id': {'S': assignment_id}},
+            UpdateExpression=(
+                'SET file_location = :file, answer_key_location = :answer, questions = :questions, '
+                '#status = :status, updated_at = :updated, '
+                'teacher_id = if_not_exists(teacher_id, :teacher), '
+                '#subject = if_not_exists(#subject, :subject), '
+                'class_info = if_not_exists(class_info, :class_info), '
+                'created_at = if_not_exists(created_at, :updated), '
+                'created_date_bucket = if_not_exists(created_date_bucket, :bucket)'
+            ),
+            ExpressionAttributeNames={'#status': 'status', '#subject': 'subject'},
+            ExpressionAttributeValues=marshal_values({
                 ':file': file_key,
                 ':answer': answer_key_path,
                 ':questions': questions,
                 ':status': 'pending_review',
-                ':updated': datetime.now().isoformat()
-            }
+                ':updated': timestamp,
+                ':teacher': teacher_id,
+                ':subject': subject,
+                ':class_info': class_info,
+                ':bucket': now.strftime('%Y-%m')
+            })
         )
-        print(f"✅ Updated DynamoDB with {len(questions)} questions")
+        if DEBUG:
+            print(f"✅ Updated DynamoDB with {len(questions)} questions")
         
     except Exception as e:
         print(f"❌ Error updating DynamoDB: {str(e)}")
@@ -276,8 +565,9 @@ def update_dynamodb_with_questions(assignment_id, teacher_id, file_key, answer_k
 
 def handle_direct_invocation(event, context):
     """Handle direct Lambda invocation or API Gateway request"""
-    print("Processing direct invocation")
-    print(f"Event keys: {list(event.keys())}")
+    if DEBUG:
+        print("Processing direct invocation")
+        print(f"Event keys: {list(event.keys())}")
     
     # Parse the request based on different invocation patterns
     body = extract_request_body(event)
@@ -288,13 +578,14 @@ def handle_direct_invocation(event, context):
         if field not in body:
             raise Exception(f"Missing required field: {field}")
     
-    bucket_name = body.get('bucket_name', 'assignment-system-dev')
+    bucket_name = body.get('bucket_name', BUCKET_NAME)
     file_key = body['file_key']
     teacher_id = body['teacher_id']
     subject = body.get('subject', 'General')
     class_info = body.get('class_info', 'Default Class')
     
-    print(f"Processing - Bucket: {bucket_name}, File: {file_key}, Teacher: {teacher_id}")
+    if DEBUG:
+        print(f"Processing - Bucket: {bucket_name}, File: {file_key}, Teacher: {teacher_id}")
     
     # Validate file type
     validate_file_type(file_key)
@@ -303,12 +594,14 @@ def handle_direct_invocation(event, context):
     validate_s3_object(bucket_name, file_key)
     
     assignment_id = str(uuid.uuid4())
-    print(f"Generated assignment ID: {assignment_id}")
+    if DEBUG:
+        print(f"Generated assignment ID: {assignment_id}")
     
     # Extract text from the uploaded file with better error handling
     try:
         assignment_text = extract_text_from_file(bucket_name, file_key)
-        print(f"Extracted text length: {len(assignment_text)} characters")
+        if DEBUG:
+            print(f"Extracted text length: {len(assignment_text)} characters")
         
         if len(assignment_text.strip()) < 10:
             raise Exception("Extracted text is too short or empty")
@@ -318,7 +611,8 @@ def handle_direct_invocation(event, context):
         return error_response(f"Failed to extract text from document: {str(e)}")
     
     questions = extract_questions_smart(assignment_text)
-    print(f"Extracted {len(questions)} questions")
+    if DEBUG:
+        print(f"Extracted {len(questions)} questions")
     
     # Get original file extension
     file_extension = file_key.split('.')[-1]
@@ -339,11 +633,13 @@ def handle_direct_invocation(event, context):
 
 def extract_request_body(event):
     """Extract and parse request body from different event sources"""
-    print("Extracting request body from event...")
+    if DEBUG:
+        print("Extracting request body from event...")
     
     # Case 1: S3 Event
     if 'Records' in event:
-        print("S3 event detected")
+        if DEBUG:
+            print("S3 event detected")
         try:
             s3_record = event['Records'][0]['s3']
             bucket_name = s3_record['bucket']['name']
@@ -352,7 +648,8 @@ def extract_request_body(event):
             import urllib.parse
             file_key = urllib.parse.unquote_plus(file_key)
             
-            print(f"S3 Event - Bucket: {bucket_name}, Key: {file_key}")
+            if DEBUG:
+                print(f"S3 Event - Bucket: {bucket_name}, Key: {file_key}")
             
             path_parts = file_key.split('/')
             teacher_id = 'default_teacher'
@@ -366,7 +663,8 @@ def extract_request_body(event):
                     tags = {tag['Key']: tag['Value'] for tag in tags_response.get('TagSet', [])}
                     if 'teacher_id' in tags:
                         teacher_id = tags['teacher_id']
-                        print(f"Found teacher_id in tags: {teacher_id}")
+                        if DEBUG:
+                            print(f"Found teacher_id in tags: {teacher_id}")
                 except Exception as tag_error:
                     print(f"No tags found or accessible: {tag_error}")
                 
@@ -379,10 +677,12 @@ def extract_request_body(event):
                         metadata = metadata_response.get('Metadata', {})
                         if 'teacher_id' in metadata:
                             teacher_id = metadata['teacher_id']
-                            print(f"Found teacher_id in metadata: {teacher_id}")
+                            if DEBUG:
+                                print(f"Found teacher_id in metadata: {teacher_id}")
                         elif 'teacherid' in metadata:
                             teacher_id = metadata['teacherid']
-                            print(f"Found teacher_id in metadata: {teacher_id}")
+                            if DEBUG:
+                                print(f"Found teacher_id in metadata: {teacher_id}")
                     except Exception as meta_error:
                         print(f"No metadata found or accessible: {meta_error}")
                 
@@ -391,12 +691,14 @@ def extract_request_body(event):
             
             if teacher_id == 'default_teacher':
                 filename = path_parts[-1] if path_parts else file_key
-                filename_match = re.match(r'^([a-zA-Z0-9_-]+)_', filename)
+                filename_match = _FILENAME_TEACHER_PAT.match(filename)
                 if filename_match:
                     teacher_id = filename_match.group(1)
-                    print(f"Extracted teacher_id from filename: {teacher_id}")
+                    if DEBUG:
+                        print(f"Extracted teacher_id from filename: {teacher_id}")
             
-            print(f"Final teacher_id: {teacher_id}")
+            if DEBUG:
+                print(f"Final teacher_id: {teacher_id}")
             
             return {
                 'file_key': file_key,
@@ -410,12 +712,14 @@ def extract_request_body(event):
     
     # Case 2: Direct Lambda invocation
     elif 'file_key' in event:
-        print("Direct Lambda invocation with JSON object")
+        if DEBUG:
+            print("Direct Lambda invocation with JSON object")
         return event
     
     # Case 3: API Gateway proxy event
     elif 'body' in event:
-        print("API Gateway proxy event")
+        if DEBUG:
+            print("API Gateway proxy event")
         body = event['body']
         
         if isinstance(body, str):
@@ -428,12 +732,14 @@ def extract_request_body(event):
     
     # Case 4: Query string parameters
     elif 'queryStringParameters' in event and event['queryStringParameters']:
-        print("API Gateway with query string parameters")
+        if DEBUG:
+            print("API Gateway with query string parameters")
         return event['queryStringParameters']
     
     # Case 5: Direct test event
     elif 'key' in event or 'path' in event:
-        print("Direct test event")
+        if DEBUG:
+            print("Direct test event")
         for key in ['file_key', 'key', 'path', 'fileName', 'filename']:
             if key in event:
                 return {'file_key': event[key], 'teacher_id': event.get('teacher_id', 'test_teacher')}
@@ -446,19 +752,19 @@ def extract_request_body(event):
 def validate_s3_object(bucket_name, file_key):
     """Validate that S3 object exists and is accessible"""
     try:
-        print(f"Validating S3 object: s3://{bucket_name}/{file_key}")
-        
-        s3_client.head_bucket(Bucket=bucket_name)
-        print(f"Bucket exists: {bucket_name}")
-        
-        s3_client.head_object(Bucket=bucket_name, Key=file_key)
-        print(f"Object exists and is accessible: {file_key}")
+        if DEBUG:
+            print(f"Validating S3 object: s3://{bucket_name}/{file_key}")
         
+        # One HEAD covers bucket and object existence, access and size
         response = s3_client.head_object(Bucket=bucket_name, Key=file_key)
+        if DEBUG:
+            print(f"Object exists and is accessible: {file_key}")
+        
         size = response.get('ContentLength', 0)
         if size == 0:
             raise Exception(f"S3 object is empty: {file_key}")
-        print(f"Object size: {size} bytes")
+        if DEBUG:
+            print(f"Object size: {size} bytes")
         
     except Exception as e:
         raise Exception(f"Failed to validate S3 object: {str(e)}")
@@ -473,7 +779,8 @@ def validate_file_type(file_key):
 
 def extract_text_from_file(bucket_name, file_key):
     """Extract text from uploaded file using Textract"""
-    print(f"Extracting text from: s3://{bucket_name}/{file_key}")
+    if DEBUG:
+        print(f"Extracting text from: s3://{bucket_name}/{file_key}")
     
     file_extension = file_key.lower().split('.')[-1]
     
@@ -486,7 +793,8 @@ def extract_text_from_file(bucket_name, file_key):
 
 def extract_text_from_pdf(textract, bucket_name, file_key):
     """Extract text from PDF using Textract"""
-    print("Starting Textract PDF processing...")
+    if DEBUG:
+        print("Starting Textract PDF processing...")
     
     try:
         response = textract.start_document_text_detection(
@@ -499,7 +807,8 @@ def extract_text_from_pdf(textract, bucket_name, file_key):
         )
         
         job_id = response['JobId']
-        print(f"Textract PDF job started: {job_id}")
+        if DEBUG:
+            print(f"Textract PDF job started: {job_id}")
         
         return wait_for_textract_job(textract, job_id)
         
@@ -509,7 +818,8 @@ def extract_text_from_pdf(textract, bucket_name, file_key):
 
 def wait_for_textract_job(textract, job_id, max_wait_time=120):
     """Wait for Textract job to complete"""
-    print("Waiting for Textract job to complete...")
+    if DEBUG:
+        print("Waiting for Textract job to complete...")
     
     start_time = time.time()
     checks = 0
@@ -521,18 +831,21 @@ def wait_for_textract_job(textract, job_id, max_wait_time=120):
             checks += 1
             
             if status == 'SUCCEEDED':
-                print(f"Textract job succeeded after {checks} checks")
-                return extract_text_from_textract_response(textract, job_id)
+                if DEBUG:
+                    print(f"Textract job succeeded after {checks} checks")
+                return extract_text_from_textract_response(textract, job_id, response)
             elif status == 'FAILED':
                 error_message = response.get('StatusMessage', 'Unknown error')
                 print(f"Textract job failed: {error_message}")
                 raise Exception(f"Textract job failed: {error_message}")
             elif status == 'PARTIAL_SUCCESS':
-                print(f"Textract job partial success after {checks} checks")
-                return extract_text_from_textract_response(textract, job_id)
+                if DEBUG:
+                    print(f"Textract job partial success after {checks} checks")
+                return extract_text_from_textract_response(textract, job_id, response)
             else:
                 wait_time = min(2 ** (checks // 3), 10)
-                print(f"Textract status: {status}, check {checks}, waiting {wait_time}s...")
+                if DEBUG:
+                    print(f"Textract status: {status}, check {checks}, waiting {wait_time}s...")
                 time.sleep(wait_time)
                 
         except Exception as e:
@@ -544,31 +857,29 @@ def wait_for_textract_job(textract, job_id, max_wait_time=120):
     print(f"Textract job timed out after {max_wait_time} seconds")
     raise Exception("Textract job timed out")
 
-def extract_text_from_textract_response(textract, job_id):
-    """Extract text from Textract response"""
-    text = ""
-    next_token = None
+def extract_text_from_textract_response(textract, job_id, first_page=None):
+    """Extract text from Textract response (first_page: an already-fetched first result page)"""
+    # Collect lines and join once; botocore has no paginator for get_document_text_detection
+    lines = []
+    response = first_page or textract.get_document_text_detection(JobId=job_id)
     
     while True:
-        if next_token:
-            response = textract.get_document_text_detection(JobId=job_id, NextToken=next_token)
-        else:
-            response = textract.get_document_text_detection(JobId=job_id)
-        
-        for block in response.get('Blocks', []):
-            if block['BlockType'] == 'LINE':
-                text += block['Text'] + '\n'
+        lines.extend(block['Text'] for block in response.get('Blocks', ()) if block['BlockType'] == 'LINE')
         
         next_token = response.get('NextToken')
         if not next_token:
             break
+        response = textract.get_document_text_detection(JobId=job_id, NextToken=next_token)
     
-    print(f"Extracted {len(text)} characters from Textract")
+    text = '\n'.join(lines) + '\n' if lines else ''
+    if DEBUG:
+        print(f"Extracted {len(text)} characters from Textract")
     return text
 
 def extract_text_from_image(textract, bucket_name, file_key):
     """Extract text from image using Textract"""
-    print("Starting Textract image processing...")
+    if DEBUG:
+        print("Starting Textract image processing...")
     
     try:
         response = textract.detect_document_text(
@@ -580,12 +891,11 @@ def extract_text_from_image(textract, bucket_name, file_key):
             }
         )
         
-        text = ""
-        for block in response.get('Blocks', []):
-            if block['BlockType'] == 'LINE':
-                text += block['Text'] + '\n'
+        lines = [block['Text'] for block in response.get('Blocks', ()) if block['BlockType'] == 'LINE']
+        text = '\n'.join(lines) + '\n' if lines else ''
         
-        print(f"Extracted {len(text)} characters from image")
+        if DEBUG:
+            print(f"Extracted {len(text)} characters from image")
         return text
         
     except Exception as e:
@@ -595,10 +905,12 @@ def extract_text_from_image(textract, bucket_name, file_key):
 def extract_text_directly(bucket_name, file_key):
     """Extract text directly from text files"""
     try:
-        print("Reading text file directly from S3...")
+        if DEBUG:
+            print("Reading text file directly from S3...")
         response = s3_client.get_object(Bucket=bucket_name, Key=file_key)
         content = response['Body'].read().decode('utf-8')
-        print(f"Extracted {len(content)} characters")
+        if DEBUG:
+            print(f"Extracted {len(content)} characters")
         return content
         
     except Exception as e:
@@ -607,40 +919,63 @@ def extract_text_directly(bucket_name, file_key):
 
 def extract_questions_smart(assignment_text):
     """Smart question extraction"""
-    print("Starting smart question extraction...")
+    if DEBUG:
+        print("Starting smart question extraction...")
     
     questions = extract_questions_direct(assignment_text)
     
     if len(questions) > 0:
-        print(f"Direct extraction found {len(questions)} questions")
-        return questions
+        if DEBUG:
+            print(f"Direct extraction found {len(questions)} questions")
+        return add_suggested_answers(questions)
     
-    print("Direct extraction failed, trying with mild cleaning...")
+    if DEBUG:
+        print("Direct extraction failed, trying with mild cleaning...")
     cleaned_text = clean_text_preserve_content(assignment_text)
     questions = extract_questions_direct(cleaned_text)
     
     if len(questions) > 0:
-        print(f"Mild cleaning extraction found {len(questions)} questions")
-        return questions
+        if DEBUG:
+            print(f"Mild cleaning extraction found {len(questions)} questions")
+        return add_suggested_answers(questions)
     
-    print("Rule-based extraction failed, trying Bedrock...")
+    if DEBUG:
+        print("Rule-based extraction failed, trying Bedrock...")
     bedrock_questions = try_bedrock_fallback(assignment_text)
     if bedrock_questions:
-        return bedrock_questions
+        return add_suggested_answers(bedrock_questions)
     
-    print("All methods failed, using basic sentence extraction...")
-    return extract_questions_basic(assignment_text)
+    if DEBUG:
+        print("All methods failed, using basic sentence extraction...")
+    return add_suggested_answers(extract_questions_basic(assignment_text))
+
+def add_suggested_answers(questions):
+    """Fill in missing suggested answers, one concurrent Bedrock call per question"""
+    pending = [question for question in questions if question['suggested_answer'] is None]
+    if not pending:
+        return questions
+    
+    with ThreadPoolExecutor(max_workers=min(ANSWER_WORKERS, len(pending))) as executor:
+        answers = executor.map(
+            lambda question: generate_specific_answer(question['question_text'], question['question_type']),
+            pending
+        )
+        for question, answer in zip(pending, answers):
+            question['suggested_answer'] = answer
+    return questions
 
 def extract_questions_direct(text):
     """Direct pattern matching"""
     questions = []
     
-    print(f"Analyzing text: {text[:200]}...")
+    if DEBUG:
+        print(f"Analyzing text: {text[:200]}...")
     
-    question_pattern1 = r'(?:Question|Problem)\s*(\d+)\s*[:\.]\s*(.+?)(?=(?:Question|Problem)\s*\d+|$)'
-    matches1 = re.finditer(question_pattern1, text, re.IGNORECASE | re.DOTALL)
+    matches1 = _Q_PAT1.finditer(text)
     
     for match in matches1:
+        if len(questions) >= MAX_DIRECT_QUESTIONS:
+            break
         question_num = match.group(1)
         question_text = match.group(2).strip()
         question_text = clean_question_text_gentle(question_text)
@@ -649,10 +984,11 @@ def extract_questions_direct(text):
             questions.append(create_question_object(question_num, question_text))
     
     if len(questions) < 2:
-        question_pattern2 = r'(\d+)\.\s*(.+?)(?=\d+\.|$)'
-        matches2 = re.finditer(question_pattern2, text, re.DOTALL)
+        matches2 = _Q_PAT2.finditer(text)
         
         for match in matches2:
+            if len(questions) >= MAX_DIRECT_QUESTIONS:
+                break
             question_num = match.group(1)
             question_text = match.group(2).strip()
             question_text = clean_question_text_gentle(question_text)
@@ -663,43 +999,46 @@ def extract_questions_direct(text):
     for i, question in enumerate(questions):
         question['question_number'] = str(i + 1)
     
-    return questions[:5]
+    return questions
 
 def clean_text_preserve_content(text):
     """Gentle text cleaning"""
-    lines = text.split('\n')
-    cleaned_lines = []
-    
-    header_removed = False
-    for line in lines:
-        line = line.strip()
-        if not header_removed and re.match(r'^(MATHEMATICS|ASSIGNMENT|GRADE|CLASS)', line, re.IGNORECASE):
-            continue
-        elif line:
-            cleaned_lines.append(line)
-            header_removed = True
-    
-    text = ' '.join(cleaned_lines)
-    text = re.sub(r'x\s*[\^²2]\s*', 'x²', text)
-    text = re.sub(r'(\d)\s+(\d)', r'\1\2', text)
-    text = re.sub(r'\s+', ' ', text)
+    # Skip leading blank and header lines; the rest is cleaned in place since newlines are whitespace
+    start = 0
+    while start < len(text):
+        end = text.find('\n', start)
+        if end < 0:
+            end = len(text)
+        line = text[start:end].strip()
+        if line and not _HEADER_PAT.match(line):
+            break
+        start = end + 1
+    else:
+        return ''
     
-    return text.strip()
+    return _CLEAN_PAT.sub(clean_token, text[start:]).strip()
+
+def clean_token(match):
+    """Replacement for each _CLEAN_PAT match"""
+    if match.group(1):
+        return 'x²'
+    if match.group(2):
+        return match.group(2) + match.group(3)
+    return ' '
 
 def clean_question_text_gentle(text):
     """Gentle cleaning of question text"""
-    text = re.split(r'\b(?:Answer|Solution|Hint)[\s\:]', text, flags=re.IGNORECASE)[0]
-    text = re.sub(r'\s+', ' ', text)
+    text = _ANSWER_SPLIT_PAT.split(text, 1)[0]
+    text = _WS_PAT.sub(' ', text)
     return text.strip()
 
 def create_question_object(number, text):
-    """Create a question object"""
-    question_type = classify_question_type_simple(text)
+    """Create a question object; add_suggested_answers fills in the answer"""
     return {
         'question_number': str(number),
         'question_text': text,
-        'question_type': question_type,
-        'suggested_answer': generate_specific_answer(text, question_type),
+        'question_type': classify_question_type_simple(text),
+        'suggested_answer': None,
         'max_score': 10
     }
 
@@ -708,23 +1047,15 @@ def looks_like_question(text):
     if len(text) < 15 or len(text) > 500:
         return False
     
-    text_lower = text.lower()
-    question_indicators = [
-        'solve', 'calculate', 'find', 'determine', 'explain', 'describe',
-        'what', 'how', 'why', 'compute', 'evaluate', 'derive'
-    ]
-    
-    return any(indicator in text_lower for indicator in question_indicators)
+    return _QUESTION_INDICATOR_PAT.search(text) is not None
 
 def classify_question_type_simple(text):
     """Simple question type classification"""
-    text_lower = text.lower()
-    
-    if any(word in text_lower for word in ['solve', 'calculate', 'find', 'compute']):
+    if _PROBLEM_SOLVING_PAT.search(text):
         return 'problem_solving'
-    elif any(word in text_lower for word in ['explain', 'describe', 'discuss']):
+    elif _EXPLANATION_PAT.search(text):
         return 'explanation'
-    elif any(word in text_lower for word in ['define', 'what is']):
+    elif _DEFINITION_PAT.search(text):
         return 'definition'
     
     return 'problem_solving'
@@ -732,37 +1063,30 @@ def classify_question_type_simple(text):
 def try_bedrock_fallback(assignment_text):
     """Bedrock fallback for question extraction"""
     try:
-        prompt = f"""
-        You are an assistant helping teachers process assignments. 
-        Extract all the questions from the following text. 
-        Do not answer them — just return a clean, numbered list of the questions exactly as written. 
-        The text may include subjects like Math, Science, Literature, or History. 
-        Return results in this format:
-
-        1. <question text>
-        2. <question text>
-        3. <question text>
-
-        Assignment text:
-        {assignment_text[:1500]}
-        """
+        excerpt = assignment_text[:1500]
+        cache_key = hashlib.sha256(excerpt.encode('utf-8')).hexdigest()
+        now = time.monotonic()
+        cached = _bedrock_cache.get(cache_key)
+        if cached and now - cached[0] < BEDROCK_CACHE_TTL:
+            if DEBUG:
+                print("Using cached Bedrock extraction")
+            return extract_questions_from_bedrock_response(cached[1], assignment_text)
+        
+        prompt = QUESTION_EXTRACTION_PROMPT.format(text=excerpt)
         
         body = {
             "inputText": prompt,
-            "textGenerationConfig": {
-                "maxTokenCount": 700,
-                "temperature": 0.2,
-                "topP": 0.9
-            }
+            "textGenerationConfig": QUESTION_EXTRACTION_GENERATION_CONFIG
         }
         
         response = bedrock_runtime.invoke_model(
             modelId='amazon.titan-text-lite-v1',
-            body=json.dumps(body)
+            body=json.dumps(body, separators=(',', ':'))
         )
         
         response_body_raw = response['body'].read()
-        print(f"Bedrock raw response length: {len(response_body_raw)} bytes")
+        if DEBUG:
+            print(f"Bedrock raw response length: {len(response_body_raw)} bytes")
         
         if not response_body_raw:
             print("Empty response from Bedrock")
@@ -775,7 +1099,13 @@ def try_bedrock_fallback(assignment_text):
             print("No output text in Bedrock response")
             return None
         
-        print(f"Bedrock response: {extracted_content[:200]}...")
+        if DEBUG:
+            print(f"Bedrock response: {extracted_content[:200]}...")
+        
+        _bedrock_cache[cache_key] = (now, extracted_content)
+        _bedrock_cache.move_to_end(cache_key)
+        while len(_bedrock_cache) > BEDROCK_CACHE_MAX:
+            _bedrock_cache.popitem(last=False)
         
         return extract_questions_from_bedrock_response(extracted_content, assignment_text)
         
@@ -789,11 +1119,13 @@ def extract_questions_from_bedrock_response(bedrock_response, original_text):
     lines = bedrock_response.strip().splitlines()
     
     for line in lines:
+        if len(questions) >= MAX_BEDROCK_QUESTIONS:
+            break
         line = line.strip()
         if not line:
             continue
 
-        match = re.match(r'^(?:Q(?:uestion)?\s*)?(\d+)[\.\:\-\)]\s*(.+)', line, re.IGNORECASE)
+        match = _Q_LINE_PAT.match(line)
         if match:
             question_num = match.group(1)
             question_text = match.group(2).strip()
@@ -803,20 +1135,22 @@ def extract_questions_from_bedrock_response(bedrock_response, original_text):
                 questions.append(create_question_object(question_num, question_text))
 
     if not questions:
-        sentences = re.split(r'[.!?]', bedrock_response)
-        for i, sentence in enumerate(sentences):
-            sentence = sentence.strip()
+        for sentence_match in _SENTENCE_PAT.finditer(bedrock_response):
+            if len(questions) >= MAX_BEDROCK_QUESTIONS:
+                break
+            sentence = sentence_match.group().strip()
             if looks_like_question(sentence) and 10 < len(sentence) < 400:
                 questions.append(create_question_object(str(len(questions) + 1), sentence))
 
     for i, question in enumerate(questions):
         question['question_number'] = str(i + 1)
 
-    return questions[:10]
+    return questions
 
 def extract_questions_basic(text):
     """Basic fallback extraction"""
-    print("Using basic sentence extraction...")
+    if DEBUG:
+        print("Using basic sentence extraction...")
     questions = []
     
     if len(text.strip()) < 50:
@@ -830,10 +1164,8 @@ def extract_questions_basic(text):
         })
         return questions
     
-    sentences = re.split(r'[.!?]+', text)
-    
-    for i, sentence in enumerate(sentences):
-        sentence = sentence.strip()
+    for sentence_match in _SENTENCE_PAT.finditer(text):
+        sentence = sentence_match.group().strip()
         if (looks_like_question(sentence) and 
             len(sentence) > 20 and 
             len(sentence) < 300 and
@@ -854,33 +1186,23 @@ def extract_questions_basic(text):
             'max_score': 10
         })
     
-    print(f"Basic extraction found {len(questions)} questions")
+    if DEBUG:
+        print(f"Basic extraction found {len(questions)} questions")
     return questions
 
 def generate_specific_answer(question_text, question_type):
     """Generate appropriate answers using Bedrock"""
     try:
-        prompt = f"""
-        You are an expert teacher assistant.
-        Answer the following student question clearly, step by step if needed.
-        Subject may be math, science, literature, history, or general knowledge.
-        Provide a well-structured answer with examples if applicable.
-        
-        Question: {question_text}
-        """
+        prompt = ANSWER_PROMPT.format(question=question_text)
         
         body = {
             "inputText": prompt,
-            "textGenerationConfig": {
-                "maxTokenCount": 500,
-                "temperature": 0.3,
-                "topP": 0.9
-            }
+            "textGenerationConfig": ANSWER_GENERATION_CONFIG
         }
         
         response = bedrock_runtime.invoke_model(
             modelId='amazon.titan-text-lite-v1',
-            body=json.dumps(body)
+            body=json.dumps(body, separators=(',', ':'))
         )
         
         response_body_raw = response['body'].read()
@@ -911,13 +1233,6 @@ def process_s3_files(s3_client, bucket_name, source_key, dest_key, answer_key_pa
     """Handle all S3 file operations"""
     try:
         copy_source = {'Bucket': bucket_name, 'Key': source_key}
-        s3_client.copy_object(
-            CopySource=copy_source,
-            Bucket=bucket_name,
-            Key=dest_key
-        )
-        print(f"Copied file to processed folder: {dest_key}")
-        
         answer_key_content = {
             'assignment_id': assignment_id,
             'generated_at': datetime.now().isoformat(),
@@ -926,13 +1241,28 @@ def process_s3_files(s3_client, bucket_name, source_key, dest_key, answer_key_pa
             'version': '1.0'
         }
         
-        s3_client.put_object(
-            Bucket=bucket_name,
-            Key=answer_key_path,
-            Body=json.dumps(answer_key_content, indent=2),
-            ContentType='application/json'
-        )
-        print(f"Created answer key: {answer_key_path}")
+        # The copy and the answer key write touch independent keys, so overlap the round-trips
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            copy_future = executor.submit(
+                s3_client.copy_object,
+                CopySource=copy_source,
+                Bucket=bucket_name,
+                Key=dest_key
+            )
+            answer_key_future = executor.submit(
+                s3_client.put_object,
+                Bucket=bucket_name,
+                Key=answer_key_path,
+                Body=json.dumps(answer_key_content, indent=2),
+                ContentType='application/json'
+            )
+            
+            copy_future.result()
+            if DEBUG:
+                print(f"Copied file to processed folder: {dest_key}")
+            answer_key_future.result()
+            if DEBUG:
+                print(f"Created answer key: {answer_key_path}")
         
     except Exception as e:
         print(f"S3 operation failed: {e}")
@@ -940,11 +1270,9 @@ def process_s3_files(s3_client, bucket_name, source_key, dest_key, answer_key_pa
 
 def store_in_dynamodb(assignment_id, teacher_id, file_key, answer_key_path, questions, subject, class_info):
     """Store assignment data in DynamoDB"""
-    table_name = 'Assignments-dev'
-    
     try:
-        table = dynamodb.Table(table_name)
-        
+        now = datetime.now()
+        timestamp = now.isoformat()
         item = {
             'assignment_id': assignment_id,
             'teacher_id': teacher_id,
@@ -954,12 +1282,14 @@ def store_in_dynamodb(assignment_id, teacher_id, file_key, answer_key_path, ques
             'subject': subject,
             'class_info': class_info,
             'status': 'pending_review',
-            'created_at': datetime.now().isoformat(),
-            'updated_at': datetime.now().isoformat()
+            'created_at': timestamp,
+            'created_date_bucket': now.strftime('%Y-%m'),
+            'updated_at': timestamp
         }
         
-        table.put_item(Item=item)
-        print(f"Stored assignment {assignment_id} in DynamoDB")
+        dynamodb_client.put_item(TableName=ASSIGNMENTS_TABLE_NAME, Item=marshal_values(item))
+        if DEBUG:
+            print(f"Stored assignment {assignment_id} in DynamoDB")
         
     except Exception as e:
         print(f"Error storing in DynamoDB: {str(e)}")
@@ -968,12 +1298,7 @@ def success_response(assignment_id, questions, bucket_name, processed_file_key,
     """Return standardized success response"""
     return {
         'statusCode': 200,
-        'headers': {
-            'Content-Type': 'application/json',
-            'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token',
-            'Access-Control-Allow-Methods': 'POST,OPTIONS,GET'
-        },
+        'headers': CORS_HEADERS,
         'body': json.dumps({
             'assignment_id': assignment_id,
             'status': 'processed',
@@ -984,19 +1309,14 @@ def success_response(assignment_id, questions, bucket_name, processed_file_key,
             'message': 'Assignment processed successfully with AI question extraction',
             'processed_at': datetime.now().isoformat(),
             'question_count': len(questions)
-        })
+        }, separators=(',', ':'))
     }
 
 def error_response(error_message):
     """Return standardized error response"""
     return {
         'statusCode': 500,
-        'headers': {
-            'Content-Type': 'application/json',
-            'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Methods': 'POST,OPTIONS,GET',
-            'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token'
-        },
+        'headers': CORS_HEADERS,
         'body': json.dumps({
             'error': 'Assignment processing failed',
             'message': error_message
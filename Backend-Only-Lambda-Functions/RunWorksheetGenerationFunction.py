@@ -1,5 +1,7 @@
 import os, json, boto3
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from botocore.config import Config
 from docx import Document
 from docx.shared import Pt
 
@@ -10,11 +12,19 @@ GENERATED_BUCKET = os.environ["GENERATED_BUCKET"]
 GENERATED_PREFIX = os.environ.get("GENERATED_PREFIX", "generated-worksheets/")
 BEDROCK_MODEL_ID = os.environ["BEDROCK_MODEL_ID"]
 
+DOCX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+boto_config = Config(
+    max_pool_connections=50,
+    retries={"max_attempts": 3, "mode": "adaptive"},
+    tcp_keepalive=True
+)
+
 # AWS clients
-dynamodb = boto3.resource("dynamodb")
+dynamodb = boto3.resource("dynamodb", config=boto_config)
 table = dynamodb.Table(TABLE_NAME)
-s3 = boto3.client("s3")
-bedrock = boto3.client("bedrock-runtime")
+s3 = boto3.client("s3", config=boto_config)
+bedrock = boto3.client("bedrock-runtime", config=boto_config)
 
 # ---------- Helpers ----------
 def fetch_processed_text(item):
@@ -110,18 +120,15 @@ def lambda_handler(event, context):
         qjson["worksheetId"] = worksheet_id
         qjson["generatedAt"] = datetime.utcnow().isoformat()
 
-        # 4. Save JSON
+        # 4-5. Save JSON and generate DOCX; each upload starts as soon as its body is ready
         json_key = f"{GENERATED_PREFIX}{worksheet_id}.json"
-        json_path = upload_to_s3(json_key, json.dumps(qjson).encode("utf-8"), "application/json")
-
-        # 5. Generate DOCX
         st_key = f"{GENERATED_PREFIX}{worksheet_id}_student.docx"
-        st_path = upload_to_s3(st_key, generate_docx(qjson, False),
-            "application/vnd.openxmlformats-officedocument.wordprocessingml.document")
-
         ans_key = f"{GENERATED_PREFIX}{worksheet_id}_answerkey.docx"
-        ans_path = upload_to_s3(ans_key, generate_docx(qjson, True),
-            "application/vnd.openxmlformats-officedocument.wordprocessingml.document")
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            json_upload = pool.submit(upload_to_s3, json_key, json.dumps(qjson).encode("utf-8"), "application/json")
+            st_upload = pool.submit(upload_to_s3, st_key, generate_docx(qjson, False), DOCX_CONTENT_TYPE)
+            ans_upload = pool.submit(upload_to_s3, ans_key, generate_docx(qjson, True), DOCX_CONTENT_TYPE)
+            json_path, st_path, ans_path = json_upload.result(), st_upload.result(), ans_upload.result()
 
         # 6. Update DynamoDB
         table.update_item(
@@ -0,0 +1,151 @@
+import os
+import time
+import boto3
+from collections import defaultdict
+from datetime import datetime, timezone
+from decimal import Decimal
+from boto3.dynamodb.types import TypeDeserializer
+from botocore.config import Config
+
+boto_config = Config(
+    max_pool_connections=50,
+    retries={'max_attempts': 3, 'mode': 'adaptive'},
+    tcp_keepalive=True
+)
+
+dynamodb = boto3.resource('dynamodb', config=boto_config)
+
+# Daily rollups read by GenerateSystemReport: metric_date (YYYY-MM-DD) -> counters
+metrics_table = dynamodb.Table(os.environ.get('SYSTEM_METRICS_TABLE', 'SystemMetricsDaily-dev'))
+
+# Per-record ledger rows share the table; TTL on expires_at clears them once the stream can no longer redeliver
+LEDGER_KEY_PREFIX = 'event#'
+LEDGER_TTL_SECONDS = 2 * 24 * 60 * 60
+
+deserializer = TypeDeserializer()
+
+def lambda_handler(event, context):
+    """Fold Submissions-dev / Assignments-dev stream records into per-day counters"""
+    # Needs FunctionResponseTypes=['ReportBatchItemFailures'] on the event source mapping
+    batch_item_failures = []
+    applied = 0
+    
+    for record in event.get('Records', []):
+        try:
+            if apply_record(record):
+                applied += 1
+        except Exception as e:
+            print(f"Failed stream record {record.get('eventID')}: {str(e)}")
+            batch_item_failures.append({'itemIdentifier': record['dynamodb']['SequenceNumber']})
+    
+    print(f"Applied {applied} of {len(event.get('Records', []))} record(s), {len(batch_item_failures)} failed")
+    return {'batchItemFailures': batch_item_failures}
+
+def apply_record(record):
+    """Add one stream record's increments exactly once; returns False if there was nothing new to add"""
+    source_arn = record.get('eventSourceARN', '')
+    stream_record = record.get('dynamodb', {})
+    new_image = deserialize(stream_record.get('NewImage'))
+    old_image = deserialize(stream_record.get('OldImage'))
+    
+    # metric_date -> counter name -> increment
+    increments = defaultdict(lambda: defaultdict(int))
+    if '/Submissions-dev/' in source_arn:
+        count_submission(record['eventName'], new_image, old_image, increments)
+    elif '/Assignments-dev/' in source_arn:
+        count_assignment(record['eventName'], new_image, increments)
+    
+    if not increments:
+        return False
+    return add_counters(record['eventID'], increments)
+
+def deserialize(image):
+    """Convert a stream image from DynamoDB JSON to plain Python values"""
+    if not image:
+        return {}
+    return {key: deserializer.deserialize(value) for key, value in image.items()}
+
+def count_submission(event_name, new_image, old_image, increments):
+    """Count new submissions and submissions that just finished evaluation, by submission day"""
+    submitted_at = new_image.get('submitted_at')
+    if not submitted_at:
+        return
+    
+    metric_date = submitted_at[:10]
+    if event_name == 'INSERT':
+        increments[metric_date]['submissions_count'] += 1
+    
+    newly_completed = (
+        event_name in ('INSERT', 'MODIFY')
+        and new_image.get('evaluation_status') == 'completed'
+        and old_image.get('evaluation_status') != 'completed'
+    )
+    if newly_completed:
+        day = increments[metric_date]
+        day['evaluated_count'] += 1
+        
+        evaluated_at = new_image.get('evaluated_at')
+        if evaluated_at:
+            try:
+                seconds = (parse_iso_timestamp(evaluated_at) - parse_iso_timestamp(submitted_at)).total_seconds()
+                day['evaluation_time_sum'] += seconds
+                day['evaluation_time_count'] += 1
+            except ValueError:
+                pass
+
+def count_assignment(event_name, new_image, increments):
+    """Count newly created assignments by creation day"""
+    created_at = new_image.get('created_at')
+    if event_name == 'INSERT' and created_at:
+        increments[created_at[:10]]['assignments_count'] += 1
+
+def add_counters(event_id, increments):
+    """Apply a record's increments in one transaction with its ledger row, so retried records add nothing"""
+    transact_items = [{
+        'Put': {
+            'TableName': metrics_table.name,
+            'Item': {
+                'metric_date': f'{LEDGER_KEY_PREFIX}{event_id}',
+                'expires_at': int(time.time()) + LEDGER_TTL_SECONDS
+            },
+            'ConditionExpression': 'attribute_not_exists(metric_date)'
+        }
+    }]
+    
+    for metric_date, counters in increments.items():
+        names = {}
+        values = {}
+        clauses = []
+        for i, (counter, amount) in enumerate(counters.items()):
+            names[f'#c{i}'] = counter
+            values[f':v{i}'] = Decimal(str(round(amount, 3)))
+            clauses.append(f'#c{i} :v{i}')
+        
+        transact_items.append({
+            'Update': {
+                'TableName': metrics_table.name,
+                'Key': {'metric_date': metric_date},
+                'UpdateExpression': 'ADD ' + ', '.join(clauses),
+                'ExpressionAttributeNames': names,
+                'ExpressionAttributeValues': values
+            }
+        })
+    
+    try:
+        dynamodb.meta.client.transact_write_items(TransactItems=transact_items)
+    except dynamodb.meta.client.exceptions.TransactionCanceledException as e:
+        reasons = e.response.get('CancellationReasons', [])
+        if reasons and reasons[0].get('Code') == 'ConditionalCheckFailed':
+            # Ledger row exists: this record was already counted by an earlier delivery
+            return False
+        raise
+    return True
+
+def parse_iso_timestamp(value):
+    """Parse an ISO-8601 timestamp as naive UTC (writers use datetime.now().isoformat() on Lambda)"""
+    if value.endswith('Z'):
+        return datetime.fromisoformat(value[:-1])
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed